@@ -33,6 +33,10 @@ const NOTIFY_URL = process.env.NOTIFY_URL || 'http://127.0.0.1:9080/notify';
 const HEALTH_URL = process.env.NOTIFIER_HOOK_HEALTH || (NOTIFY_URL.replace(/\/notify(\b|$)/, '/health'));
 const DEBUG = !!process.env.NOTIFIER_DEBUG;
 
+// Shared keep-alive agent so repeated notifications reuse one TCP connection
+// to the webhook instead of opening a fresh socket per POST.
+const AGENT = new http.Agent({ keepAlive: true, maxSockets: 4 });
+
 let callCount = 0;
 
 // ─────────────────────────────────────────────────────────────
@@ -125,26 +129,44 @@ function inferAction(title, body) {
 
 // urgency/sound decoration is no longer critical (webhook sets priority),
 // but we keep a simple mapping for logging/debug parity with your original.
+// Tones are frozen module-level constants so classifyTone doesn't allocate
+// a fresh object per notification.
+const TONE_HIGH     = Object.freeze({ urgency: 'high',   sound: 'siren'    });
+const TONE_DONE     = Object.freeze({ urgency: 'normal', sound: 'magic'    });
+const TONE_DEFAULT  = Object.freeze({ urgency: 'normal', sound: 'pushover' });
+const TONE_LOW      = Object.freeze({ urgency: 'low',    sound: 'bike'     });
+
 function classifyTone(title, body) {
   const txt = toLower(`${title} ${body}`);
-  if (/\b(error|fail|failed|fatal)\b/.test(txt)) return { urgency: 'high',   sound: 'siren'   };
-  if (/\b(complete|finished|done)\b/.test(txt)) return { urgency: 'normal', sound: 'magic'   };
-  if (/\b(start|begin|download)\b/.test(txt))   return { urgency: 'normal', sound: 'pushover' };
-  if (/\b(schedul)\b/.test(txt))                return { urgency: 'low',    sound: 'bike'    };
-  return { urgency: 'normal', sound: 'pushover' };
+  if (/\b(error|fail|failed|fatal)\b/.test(txt)) return TONE_HIGH;
+  if (/\b(complete|finished|done)\b/.test(txt)) return TONE_DONE;
+  if (/\b(start|begin|download)\b/.test(txt))   return TONE_DEFAULT;
+  if (/\b(schedul)\b/.test(txt))                return TONE_LOW;
+  return TONE_DEFAULT;
 }
 
+// Endpoint URLs never change at runtime — parse them once at load instead
+// of re-running url.parse() on every send/health probe.
+const NOTIFY_ENDPOINT = url.parse(NOTIFY_URL);
+const HEALTH_ENDPOINT = url.parse(HEALTH_URL);
+
 // POST helper
-function postJson(targetUrl, obj, cb) {
-  const u = url.parse(targetUrl);
+function postJson(u, obj, cb) {
   const data = Buffer.from(JSON.stringify(obj));
   const req = http.request({
     hostname: u.hostname,
     port: u.port || 80,
     path: u.path || '/notify',
     method: 'POST',
+    agent: AGENT,
     headers: { 'Content-Type': 'application/json', 'Content-Length': data.length }
   }, (res) => {
+    // Fire-and-forget fast path: when nobody consumes the body (no callback,
+    // debug off, 2xx), drain the response without buffering it.
+    if (!cb && !DEBUG && res.statusCode === 200) {
+      res.resume();
+      return;
+    }
     let chunks = '';
     res.on('data', c => chunks += c);
     res.on('end', () => {
@@ -161,12 +183,20 @@ function postJson(targetUrl, obj, cb) {
   req.write(data); req.end();
 }
 
-// Optional preflight
+// Optional preflight. The probe result is only advisory (we send either
+// way), so don't pay an extra HTTP round-trip per notification — probe at
+// most once per cool-off window and skip straight to the send otherwise.
+const HEALTH_PROBE_COOLOFF_MS = parseInt(process.env.NOTIFIER_HEALTH_COOLOFF_MS || '60000', 10);
+let lastHealthProbe = 0;
+
 function healthCheck(cb) {
   if (!HEALTH_URL) return cb && cb();
-  const u = url.parse(HEALTH_URL);
+  const now = Date.now();
+  if (now - lastHealthProbe < HEALTH_PROBE_COOLOFF_MS) return cb && cb();
+  lastHealthProbe = now;
+  const u = HEALTH_ENDPOINT;
   const req = http.request({
-    hostname: u.hostname, port: u.port || 80, path: u.path || '/health', method: 'GET', timeout: 1000
+    hostname: u.hostname, port: u.port || 80, path: u.path || '/health', method: 'GET', agent: AGENT, timeout: 1000
   }, (res) => { res.resume(); cb && cb(); });
   req.on('error', () => cb && cb());
   req.on('timeout', () => { try { req.destroy(); } catch {} cb && cb(); });
@@ -225,9 +255,11 @@ function notify(options, callback) {
     }
   };
 
-  // Quick health probe, then send
+  // Quick health probe, then send. Only hand postJson a callback when the
+  // caller supplied one — passing `done` unconditionally would defeat the
+  // fire-and-forget fast path (cb would always be truthy).
   healthCheck(() => {
-    postJson(NOTIFY_URL, payload, done);
+    postJson(NOTIFY_ENDPOINT, payload, typeof callback === 'function' ? done : null);
   });
 
   return true;
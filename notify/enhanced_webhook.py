@@ -1,11 +1,19 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
-import json, os, time, urllib.parse, re, logging, sys
+import json, os, time, urllib.parse, re, logging, sys, itertools, bisect, heapq, functools, random
 from datetime import datetime, timezone, timedelta
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict, deque
 import httpx
 import asyncio
-import aiofiles
+
+# orjson parses/serializes JSON several times faster than the stdlib and is
+# in the image, but keep a fallback so the webhook still runs without it.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
 
 def _str(val):
     """Safely extract a string from EPG fields that may be a plain string or
@@ -53,6 +61,10 @@ class StructuredLogger:
 
 logger = StructuredLogger("webhook")
 
+# EPG score breakdowns are only ever read by debug logging; skip building
+# them entirely unless DEBUG level is active.
+_SCORE_DEBUG = logger.current_level <= logger.levels['DEBUG']
+
 # Import TMDB helper
 try:
     from tmdb_helper import enrich_movie_metadata, enrich_series_metadata
@@ -61,44 +73,83 @@ except ImportError:
     TMDB_AVAILABLE = False
     logger.warning("TMDB helper not available", "Movie/series metadata enrichment disabled")
 
+# Enrichment kind -> (enrich function, date field carrying the year). Movie
+# and series handling is otherwise identical, so notify() runs one
+# table-driven enrichment block instead of two near-duplicate ones.
+if TMDB_AVAILABLE:
+    _TMDB_DISPATCH = {
+        'movie': (enrich_movie_metadata, 'release_date'),
+        'series': (enrich_series_metadata, 'first_air_date'),
+    }
+else:
+    _TMDB_DISPATCH = {}
+
+# Webhook-side TTL cache over TMDB enrichment. tmdb_helper caches parsed API
+# responses, but this layer also skips the worker-thread hop and title parse
+# for repeat titles (episodes of the same series, retried downloads).
+_ENRICH_CACHE_TTL = int(os.environ.get('TMDB_ENRICH_TTL', str(24 * 3600)))
+
+async def _cached_enrich(kind, func, *args):
+    key = (kind,) + args
+    hit = _enrich_cache.get(key)
+    if hit is not None and hit[1] > time.time():
+        return hit[0]
+    result = await asyncio.to_thread(func, *args)
+    _enrich_cache[key] = (result, time.time() + _ENRICH_CACHE_TTL)
+    return result
+
 # Notification deduplication cache (TTL-based)
 # Prevents duplicate notifications from being processed within a 60-second window
 import hashlib
 _notification_cache = OrderedDict()  # Track recent notifications with timestamp
 NOTIFICATION_DEDUP_WINDOW = 60  # seconds
+NOTIFICATION_CACHE_MAX_SIZE = int(os.environ.get('NOTIFY_DEDUP_MAX_SIZE', '10000'))
 
 def _check_and_record_notification(action, job_id_full, file_path):
     """
     Check if notification was recently sent, and record it if not.
     Returns: (is_duplicate, time_since_last)
+
+    The OrderedDict doubles as a TTL cache: entries are inserted (and
+    re-inserted) in timestamp order, so expiry only ever needs to peel
+    entries off the front — amortized O(1) per call, memory capped below.
     """
-    # Create dedup key from action + full job ID + file path
-    dedup_key = hashlib.md5(
-        f"{action}:{job_id_full}:{file_path}".encode()
-    ).hexdigest()
+    # Create dedup key from action + full job ID + file path.
+    # blake2b is faster than md5 and an 8-byte raw digest is plenty for a
+    # non-cryptographic dedup key (and 4x smaller than an md5 hexdigest).
+    dedup_key = hashlib.blake2b(
+        f"{action}:{job_id_full}:{file_path}".encode(), digest_size=8
+    ).digest()
 
     current_time = time.time()
 
-    # Check if we've seen this notification recently
-    if dedup_key in _notification_cache:
-        last_sent = _notification_cache[dedup_key]
-        elapsed = current_time - last_sent
-
-        if elapsed < NOTIFICATION_DEDUP_WINDOW:
-            return (True, elapsed)  # Is a duplicate
+    # Drop entries that have aged out of the window; stop at the first live
+    # one since insertion order is time order.
+    while _notification_cache:
+        oldest_key = next(iter(_notification_cache))
+        if current_time - _notification_cache[oldest_key] < NOTIFICATION_DEDUP_WINDOW:
+            break
+        del _notification_cache[oldest_key]
 
-        # Remove old entry if outside window
-        del _notification_cache[dedup_key]
+    # Check if we've seen this notification recently
+    last_sent = _notification_cache.get(dedup_key)
+    if last_sent is not None:
+        return (True, current_time - last_sent)  # Is a duplicate
 
     # Record this notification
     _notification_cache[dedup_key] = current_time
 
-    # Keep cache size bounded (remove oldest entries if > 1000)
-    while len(_notification_cache) > 1000:
+    # Keep cache size bounded; one insert grows it by at most one entry
+    if len(_notification_cache) > NOTIFICATION_CACHE_MAX_SIZE:
         _notification_cache.popitem(last=False)
 
     return (False, 0)  # Not a duplicate
 
+# Serialize responses through orjson when it's installed; ORJSONResponse has
+# the same constructor signature, so the JSONResponse call sites don't change.
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as JSONResponse
+
 app = FastAPI(title="Snappier Webhook", version="1.0")
 
 PO_USER  = os.environ.get('PUSHOVER_USER_KEY','')
@@ -107,9 +158,18 @@ EPG_CACHE = os.environ.get('EPG_CACHE','/root/SnappierServer/epg/epg_cache.json'
 SCHEDULES = os.environ.get('SCHEDULES','/root/SnappierServer/schedules.json')
 TITLE_PREFIX = os.environ.get('NOTIFY_TITLE_PREFIX','🎬 Snappier')
 
+NOTIFY_RETRY_ATTEMPTS = int(os.environ.get('NOTIFY_RETRY_ATTEMPTS', '3'))
+NOTIFY_RETRY_DELAY = float(os.environ.get('NOTIFY_RETRY_DELAY', '2'))
+
 PROBE_TIMEOUT = int(os.environ.get('HTTPS_PROBE_TIMEOUT','3'))
 PROBE_METHOD  = os.environ.get('HTTPS_PROBE_METHOD','HEAD').upper()
 SAFE_HTTP_HOSTS = set((os.environ.get('ALLOW_HTTP_HOSTS','localhost,127.0.0.1,snappier-server').split(',')))
+# Host suffixes known to terminate TLS (major CDNs); assume HTTPS works and
+# skip the network probe entirely for these.
+HTTPS_KNOWN_SUFFIXES = tuple(s for s in os.environ.get(
+    'HTTPS_KNOWN_SUFFIXES',
+    '.cloudfront.net,.akamaized.net,.akamaihd.net,.fastly.net,.amazonaws.com,'
+    '.googleapis.com,.azureedge.net,.cdn77.org').split(',') if s)
 
 # Xtream channel cache for stream_id → epg_channel_id resolution
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
@@ -126,6 +186,14 @@ SNAPPY_API_TIMEOUT = float(os.environ.get('SNAPPY_API_TIMEOUT','5'))
 # Cache limits
 EPG_INDEX_MAX_SIZE = int(os.environ.get('EPG_INDEX_MAX_SIZE', '50000'))
 HTTPS_CACHE_MAX_SIZE = int(os.environ.get('HTTPS_CACHE_MAX_SIZE', '1000'))
+# How long a probe verdict stays valid before the host is re-probed; hosts do
+# occasionally gain (or lose) HTTPS support, so verdicts must expire.
+# Failures expire much faster so transient outages don't pin a host to HTTP.
+HTTPS_CACHE_TTL = int(os.environ.get('HTTPS_CACHE_TTL', '3600'))
+HTTPS_CACHE_FAIL_TTL = int(os.environ.get('HTTPS_CACHE_FAIL_TTL', '300'))
+# On-disk copy of the probe cache so a container restart doesn't trigger a
+# cold-start probe storm. Empty string disables persistence.
+HTTPS_CACHE_FILE = os.environ.get('HTTPS_CACHE_FILE', '/tmp/https_cap.json')
 
 # Bounded LRU cache implementation
 class BoundedDict(OrderedDict):
@@ -140,15 +208,53 @@ class BoundedDict(OrderedDict):
         self.move_to_end(key)
         return value
 
+    def get(self, key, default=None):
+        # dict.get is C-level and bypasses __getitem__, which would silently
+        # drop the recency touch and degrade eviction to FIFO.
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
     def __setitem__(self, key, value):
         if key in self:
             # Move to end (mark as recently used)
             del self[key]
         super().__setitem__(key, value)
-        # Evict oldest if over limit
-        while len(self) > self.max_size:
-            oldest = next(iter(self))
-            del self[oldest]
+        # Evict oldest if over limit. Inserts grow the dict by at most one,
+        # so a single popitem(last=False) (O(1)) is enough.
+        if len(self) > self.max_size:
+            self.popitem(last=False)
+
+# (program, file) -> (tmdb metadata, expiry) for _cached_enrich above
+_enrich_cache = BoundedDict(int(os.environ.get('TMDB_ENRICH_CACHE_MAX_SIZE', '256')))
+
+# Shared HTTP clients, created lazily and closed on app shutdown. Reusing one
+# AsyncClient keeps the connection pool (and TLS sessions) warm instead of
+# rebuilding pool + SSL context on every probe/search/push.
+_http_client = None      # verified TLS (Pushover)
+_insecure_client = None  # verify=False (self-signed Snappy API, HTTPS probes)
+
+def _get_http_client():
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            # Generous read/write for attachment uploads, but fail fast on
+            # connect/pool acquisition so a dead Pushover endpoint doesn't
+            # stall the notify path for the full request timeout.
+            timeout=httpx.Timeout(connect=5.0, read=15.0, write=15.0, pool=5.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20,
+                                keepalive_expiry=10.0))
+    return _http_client
+
+def _get_insecure_client():
+    global _insecure_client
+    if _insecure_client is None:
+        _insecure_client = httpx.AsyncClient(
+            verify=False,
+            timeout=httpx.Timeout(15.0),
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64))
+    return _insecure_client
 
 _https_support = BoundedDict(HTTPS_CACHE_MAX_SIZE)
 _epg_cache_data = None
@@ -156,9 +262,52 @@ _epg_cache_mtime = None
 _epg_index = None
 _epg_channel_display = {}
 _cache_stats = {'epg_hits': 0, 'epg_misses': 0, 'https_probes': 0, 'memory_warnings': 0}
+# Monotonic token per cache_find_program call, used to mark programme dicts
+# already collected as candidates within that search.
+_search_counter = itertools.count(1)
 
 _OFFSET_PATTERN = re.compile(r'^[+-]\d{4}$')
 
+# Hot-path patterns, compiled once at import so per-call lookups in re's
+# internal cache are skipped (clean_channel_name / _parse_timestamp / the
+# EPG scoring loops can run hundreds of times per webhook).
+_REGION_SUFFIX_RE = re.compile(r'\.(us|ca|uk|au|mx|tv)\b', re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+_NONDIGIT_RE = re.compile(r'[^0-9]')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+# Unicode superscript/modifier markers (e.g. ᴸᶦᵛᵉ, ᴺᵉʷ) stripped from titles
+_SUPERSCRIPT_RE = re.compile(r'[\u02b0-\u02ff\u1d2c-\u1dff\u2070-\u209f]+')
+
+# Network-preference scoring: a single compiled alternation replaces the old
+# chain of ~14 substring tests per candidate. Alternation order keeps the old
+# elif precedence when two tokens start at the same position (FOXNEWS vs FOX).
+_NETWORK_RE = re.compile(
+    r'(?P<foxnews>FOX ?NEWS)'
+    r'|(?P<major>NBC|CBS|ABC|FOX)'
+    r'|(?P<cable>AMC|TNT|USA|TBS|BRAVO|FX|HULU)'
+    r'|(?P<afn>AFN|MILITARY)'
+)
+# Resolved once at import: the description trim limit and the local zone for
+# catch-up start-time formatting. TZ never changes for the container's life.
+DESC_LIMIT = int(os.environ.get("NOTIFY_DESC_LIMIT", "900"))
+try:
+    from zoneinfo import ZoneInfo as _ZoneInfo
+    _LOCAL_TZ = _ZoneInfo(os.environ['TZ']) if os.environ.get('TZ') else None
+except Exception:
+    _LOCAL_TZ = None
+
+# Per-request patterns from the notify() path, compiled once at import.
+_APOSTROPHE_S_RE = re.compile(r' s\b', re.IGNORECASE)
+_EPISODE_RE = re.compile(r'^(S\d+E\d+)\s*(?:[-:]\s*)?(.*)$')
+_CHAN_REGION_PREFIX_RE = re.compile(r'^[A-Z]{2,3}\s*:\s*')
+
+_NETWORK_BONUS = {
+    'foxnews': ('network_foxnews', 5),
+    'major':   ('network_major', 3),
+    'cable':   ('network_cable', 4),
+    'afn':     ('network_afn_penalty', -10),
+}
+
 def clean_channel_name(value):
     """
     Normalize channel names that often include region codes, IDs, or suffixes.
@@ -176,9 +325,9 @@ def clean_channel_name(value):
             val = pieces[-1]
 
     val = val.replace('_', ' ')
-    val = re.sub(r'\.(us|ca|uk|au|mx|tv)\b', '', val, flags=re.IGNORECASE)
+    val = _REGION_SUFFIX_RE.sub('', val)
     val = val.replace('/', ' / ')
-    val = re.sub(r'\s+', ' ', val).strip()
+    val = _WS_RE.sub(' ', val).strip()
 
     # Remove region prefixes (handle both "US " and "US:" formats)
     region_prefixes = {"US", "CA", "UK", "AU", "MX", "NZ"}
@@ -205,7 +354,12 @@ def _parse_timestamp(raw):
     text = str(raw).strip()
     if not text:
         return None
+    return _parse_timestamp_text(text)
 
+# Timestamps repeat heavily (retries, duplicates, shared start times across a
+# schedule), the parse is pure, and datetimes are immutable — memoize it.
+@functools.lru_cache(maxsize=4096)
+def _parse_timestamp_text(text):
     if text.endswith('Z'):
         try:
             return datetime.fromisoformat(text.replace('Z', '+00:00'))
@@ -222,7 +376,7 @@ def _parse_timestamp(raw):
             offset = sanitized[idx:]
             break
 
-    digits = re.sub(r'[^0-9]', '', base)
+    digits = _NONDIGIT_RE.sub('', base)
     if len(digits) < 6:
         return None
     if len(digits) < 14:
@@ -258,6 +412,10 @@ def _normalize_start(raw):
     except Exception:
         return None
 
+# Serializes EPG reloads: without it, every notify that lands while the
+# parse is in flight would kick off its own multi-MB reparse.
+_epg_load_lock = asyncio.Lock()
+
 async def _load_epg_cache():
     global _epg_cache_data, _epg_cache_mtime, _epg_index, _epg_channel_display
     path = EPG_CACHE
@@ -266,11 +424,16 @@ async def _load_epg_cache():
     except OSError:
         mtime = None
 
-    if _epg_cache_data is None or mtime != _epg_cache_mtime:
-        _epg_cache_data = await load_json(path) or {}
-        _epg_cache_mtime = mtime
-        _epg_index = None
-        _epg_channel_display = {}
+    if _epg_cache_data is not None and mtime == _epg_cache_mtime:
+        return _epg_cache_data
+
+    async with _epg_load_lock:
+        # Re-check: another request may have reloaded while we waited.
+        if _epg_cache_data is None or mtime != _epg_cache_mtime:
+            _epg_cache_data = await load_json(path) or {}
+            _epg_cache_mtime = mtime
+            _epg_index = None
+            _epg_channel_display = {}
 
     return _epg_cache_data
 
@@ -283,38 +446,65 @@ async def _ensure_epg_index():
 
     _cache_stats['epg_misses'] += 1
     programmes = data.get('programmes') or []
-    by_start = {}
-    by_title = {}
-    by_channel = {}  # channel_id (lowercase) -> list of programmes
+    # defaultdict skips the per-entry key probe setdefault pays even on hits;
+    # converted back to plain dicts below so lookups can never grow them.
+    by_start = defaultdict(list)
+    by_title = defaultdict(list)
+    by_title_norm = defaultdict(list)  # punctuation-stripped title -> list of programmes
+    by_channel = defaultdict(list)  # channel_id (lowercase) -> list of programmes
     total_entries = 0
 
     for ev in programmes:
         start_key = _normalize_start(ev.get('start'))
+        # Cache the parsed epoch on the programme so match loops don't
+        # re-parse the same start string on every lookup.
+        ev['_start_key'] = start_key
         if start_key is not None:
-            by_start.setdefault(start_key, []).append(ev)
+            by_start[start_key].append(ev)
             total_entries += 1
-        title = _str(ev.get('title')).strip().lower()
+        # Intern the lowered titles: reruns of the same programme share one
+        # string object, and interned-vs-interned equality short-circuits on
+        # identity before falling back to a character compare.
+        title = sys.intern(_str(ev.get('title')).strip().lower())
         if title:
-            bucket = by_title.setdefault(title, [])
+            bucket = by_title[title]
             if len(bucket) < 50:
                 bucket.append(ev)
                 total_entries += 1
-        chan = (ev.get('channel') or '').lower()
+        # Precompute the lowered/normalized forms once per programme so the
+        # match and scoring loops don't redo the same string work per request.
+        title_norm = sys.intern(_PUNCT_RE.sub('', title).strip())
+        ev['_title_lower'] = title
+        ev['_title_norm'] = title_norm
+        if title_norm:
+            bucket = by_title_norm[title_norm]
+            if len(bucket) < 50:
+                bucket.append(ev)
+        chan_raw = ev.get('channel') or ''
+        ev['_chan_upper'] = chan_raw.upper()
+        ev['_chan_clean_lower'] = clean_channel_name(chan_raw).lower()
+        chan = chan_raw.lower()
         if chan:
-            by_channel.setdefault(chan, []).append(ev)
+            by_channel[chan].append(ev)
+
+    by_start = dict(by_start)
+    by_title = dict(by_title)
+    by_title_norm = dict(by_title_norm)
+    by_channel = dict(by_channel)
 
     # Enforce size limits by keeping most recent/relevant entries
     if total_entries > EPG_INDEX_MAX_SIZE:
         _cache_stats['memory_warnings'] += 1
-        # Keep only recent timestamps in by_start
+        # Keep only recent timestamps in by_start. nlargest selects the top
+        # half in O(n log k) without materializing a full sorted copy.
         if len(by_start) > EPG_INDEX_MAX_SIZE // 2:
-            sorted_keys = sorted(by_start.keys(), reverse=True)[:EPG_INDEX_MAX_SIZE // 2]
-            by_start = {k: by_start[k] for k in sorted_keys}
+            recent_keys = heapq.nlargest(EPG_INDEX_MAX_SIZE // 2, by_start)
+            by_start = {k: by_start[k] for k in recent_keys}
 
         # Keep most populated titles in by_title
         if len(by_title) > EPG_INDEX_MAX_SIZE // 2:
-            sorted_titles = sorted(by_title.items(), key=lambda x: len(x[1]), reverse=True)[:EPG_INDEX_MAX_SIZE // 2]
-            by_title = dict(sorted_titles)
+            by_title = dict(heapq.nlargest(
+                EPG_INDEX_MAX_SIZE // 2, by_title.items(), key=lambda x: len(x[1])))
 
     display = {}
     channels = data.get('channels') or {}
@@ -330,77 +520,159 @@ async def _ensure_epg_index():
                 display.setdefault(variant, disp)
 
     _epg_channel_display = display
-    _epg_index = {'by_start': by_start, 'by_title': by_title, 'by_channel': by_channel}
+    _epg_index = {'by_start': by_start, 'by_title': by_title,
+                  'by_title_norm': by_title_norm, 'by_channel': by_channel,
+                  # Sorted start keys let timestamp lookups bisect a ±window
+                  # instead of probing fixed offsets.
+                  'sorted_starts': sorted(by_start)}
     return data, _epg_index
 
+def _load_json_sync(path):
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
 async def load_json(path, timeout_sec=5):
     """Load JSON from file asynchronously"""
     try:
-        async with aiofiles.open(path, 'r', encoding='utf-8') as f:
-            content = await f.read()
-            result = await asyncio.to_thread(json.loads, content)
-        return result
+        # One worker-thread hop for read+parse: aiofiles dispatches every
+        # open/read/close to the executor separately, which costs more than
+        # the blocking read it avoids.
+        return await asyncio.to_thread(_load_json_sync, path)
     except FileNotFoundError:
         logger.debug(f"File not found: {path}")
         return None
-    except json.JSONDecodeError as e:
+    except ValueError as e:  # covers json.JSONDecodeError and orjson.JSONDecodeError
         logger.warning(f"Invalid JSON in {path}", str(e))
         return None
     except Exception as e:
         logger.error(f"Failed to load {path}", str(e))
         return None
 
+# Schedules repeat the same stream/logo URLs across many entries; memoizing
+# turns the repeated urlparse into a dict hit.
+@functools.lru_cache(maxsize=2048)
 def _host_from_url(url: str):
     try:
         return urllib.parse.urlparse(url).hostname
     except Exception:
         return None
 
+# host -> in-flight probe task, so concurrent requests for the same host
+# share one HEAD/GET instead of racing duplicate probes.
+_https_probe_tasks = {}
+
 async def _probe_https_once(url_http: str) -> bool:
-    global _cache_stats
     if not url_http.startswith('http://'):
         return False
-    https_url = 'https://' + url_http[len('http://'):]
+    https_url = 'https' + url_http[4:]  # splice the scheme only; '://' comes along in the slice
     host = _host_from_url(https_url)
     if not host or host in SAFE_HTTP_HOSTS:
         return False
-    if host in _https_support:
-        return _https_support[host]
+    entry = _https_support.get(host)
+    if entry is not None and time.time() < entry[1]:
+        return entry[0]
+    if host.endswith(HTTPS_KNOWN_SUFFIXES):
+        _https_support[host] = (True, time.time() + HTTPS_CACHE_TTL)
+        return True
+
+    task = _https_probe_tasks.get(host)
+    if task is None:
+        task = asyncio.ensure_future(_probe_host(host, https_url))
+        _https_probe_tasks[host] = task
+    try:
+        return await task
+    finally:
+        _https_probe_tasks.pop(host, None)
 
+async def _probe_host(host: str, https_url: str) -> bool:
+    global _cache_stats
     _cache_stats['https_probes'] += 1
     try:
-        async with httpx.AsyncClient(timeout=PROBE_TIMEOUT, verify=False) as client:
-            if PROBE_METHOD == 'GET':
-                r = await client.get(https_url, follow_redirects=True)
-            else:
-                r = await client.head(https_url, follow_redirects=True)
-            ok = 200 <= r.status_code < 400
+        client = _get_insecure_client()
+        if PROBE_METHOD == 'GET':
+            r = await client.get(https_url, follow_redirects=True, timeout=PROBE_TIMEOUT)
+        else:
+            r = await client.head(https_url, follow_redirects=True, timeout=PROBE_TIMEOUT)
+        ok = 200 <= r.status_code < 400
     except Exception:
         ok = False
-    _https_support[host] = ok  # BoundedDict will handle eviction
+    # (verdict, expiry); BoundedDict handles size eviction, the expiry
+    # timestamp handles staleness.
+    _https_support[host] = (ok, time.time() + (HTTPS_CACHE_TTL if ok else HTTPS_CACHE_FAIL_TTL))
     return ok
 
+def _load_https_cache():
+    """Seed _https_support from the on-disk copy, dropping expired entries."""
+    if not HTTPS_CACHE_FILE:
+        return
+    try:
+        with open(HTTPS_CACHE_FILE, 'rb') as f:
+            entries = _json_loads(f.read())
+    except (OSError, ValueError):
+        return
+    if not isinstance(entries, dict):
+        return
+    now = time.time()
+    loaded = 0
+    for host, entry in entries.items():
+        try:
+            ok, expiry = entry
+        except (TypeError, ValueError):
+            continue
+        if now < expiry:
+            _https_support[host] = (bool(ok), float(expiry))
+            loaded += 1
+    if loaded:
+        logger.info("HTTPS capability cache loaded", f"hosts={loaded}, file={HTTPS_CACHE_FILE}")
+
+def _save_https_cache():
+    """Write the probe cache atomically; best-effort, /tmp may be read-only."""
+    if not HTTPS_CACHE_FILE or not _https_support:
+        return
+    try:
+        payload = {h: [v[0], v[1]] for h, v in _https_support.items()}
+        tmp = HTTPS_CACHE_FILE + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp, HTTPS_CACHE_FILE)
+    except OSError:
+        pass
+
+def _collect_http_urls(obj, limit=2000):
+    """Iteratively gather http:// URLs from a nested JSON structure.
+
+    A plain list-as-stack walk: no coroutine frame per node, and the probes
+    can then run concurrently instead of one await per leaf string.
+    """
+    out = []
+    stack = [obj]
+    while stack and len(out) < limit:
+        o = stack.pop()
+        if isinstance(o, dict):
+            stack.extend(o.values())
+        elif isinstance(o, list):
+            stack.extend(o)
+        elif isinstance(o, str) and o.startswith('http://'):
+            out.append(o)
+    return out
+
 async def _preflight_scan():
     try:
+        urls = set()
         for path in (SCHEDULES, EPG_CACHE):
             data = await load_json(path)
             if not data: continue
-            async def walk(o, seen=0, limit=2000):
-                if seen >= limit: return seen
-                if isinstance(o, dict):
-                    for _, v in o.items():
-                        seen = await walk(v, seen, limit)
-                        if seen >= limit: break
-                elif isinstance(o, list):
-                    for v in o:
-                        seen = await walk(v, seen, limit)
-                        if seen >= limit: break
-                elif isinstance(o, str):
-                    if o.startswith('http://'):
-                        await _probe_https_once(o)
-                        seen += 1
-                return seen
-            await walk(data, 0, 2000)
+            urls.update(_collect_http_urls(data))
+        if urls:
+            # Probe concurrently but bounded, mirroring a 16-worker pool:
+            # hundreds of simultaneous sockets at startup would just contend.
+            sem = asyncio.Semaphore(16)
+
+            async def _bounded_probe(u):
+                async with sem:
+                    return await _probe_https_once(u)
+
+            await asyncio.gather(*(_bounded_probe(u) for u in urls))
     except Exception:
         pass
 
@@ -419,28 +691,45 @@ async def api_search(title=None, channel=None, limit=10):
         if channel: params['channel'] = channel
         if limit:   params['limit'] = str(limit)
         url = f"{SNAPPY_API_BASE}/epg/search"
-        async with httpx.AsyncClient(timeout=SNAPPY_API_TIMEOUT, verify=False) as client:
-            r = await client.get(url, params=params, headers=_api_headers())
-            if not r.is_success:
-                return None, {}
-            hits = r.json()
-            meta = {'total': r.headers.get('X-Total-Results'), 'returned': r.headers.get('X-Returned-Results')}
-            if isinstance(hits, list) and hits:
-                return hits, meta
-            return None, meta
+        client = _get_insecure_client()
+        r = await client.get(url, params=params, headers=_api_headers(), timeout=SNAPPY_API_TIMEOUT)
+        if not r.is_success:
+            return None, {}
+        hits = r.json()
+        meta = {'total': r.headers.get('X-Total-Results'), 'returned': r.headers.get('X-Returned-Results')}
+        if isinstance(hits, list) and hits:
+            return hits, meta
+        return None, meta
     except Exception:
         return None, {}
 
+# canonical field -> (candidate keys in preference order, coerce via _str).
+# Driving _coerce_event from this table stops at the first usable candidate
+# instead of hashing every alias through chained `or` expressions.
+_FIELD_ALIASES = (
+    ('title',    ('title', 'name', 'programTitle'),  True),
+    ('subtitle', ('subtitle', 'episodeTitle'),       True),
+    ('desc',     ('desc', 'description'),            True),
+    ('start',    ('start', 'start_ts', 'startTime'), False),
+    ('channel',  ('channel', 'channelName', 'ch'),   False),
+    ('type',     ('type',),                          False),
+    ('year',     ('year', 'releaseYear'),            False),
+)
+
 def _coerce_event(ev):
     if not isinstance(ev, dict): return None
-    title = _str(ev.get('title')) or _str(ev.get('name')) or _str(ev.get('programTitle'))
-    subtitle = _str(ev.get('subtitle')) or _str(ev.get('episodeTitle'))
-    desc = _str(ev.get('desc')) or _str(ev.get('description'))
-    start = ev.get('start') or ev.get('start_ts') or ev.get('startTime')
-    channel = ev.get('channel') or ev.get('channelName') or ev.get('ch')
-    typ = ev.get('type')
-    year = ev.get('year') or ev.get('releaseYear')
-    return {'title': title, 'subtitle': subtitle, 'desc': desc, 'start': start, 'channel': channel, 'type': typ, 'year': year}
+    out = {}
+    for canonical, keys, as_str in _FIELD_ALIASES:
+        val = '' if as_str else None
+        for k in keys:
+            v = ev.get(k)
+            if as_str:
+                v = _str(v)
+            if v:
+                val = v
+                break
+        out[canonical] = val
+    return out
 
 def _pick_best_from_list(lst, want_title=None, want_start=None):
     want = (want_title or '').strip().lower()
@@ -448,13 +737,15 @@ def _pick_best_from_list(lst, want_title=None, want_start=None):
     best = None
     best_score = -1
 
+    # Score against the raw API hits, reading only the two fields scoring
+    # needs; the full _coerce_event dict is built once for the winner.
     for ev in lst:
-        cev = _coerce_event(ev)
-        if not cev:
+        if not isinstance(ev, dict):
             continue
 
         score = 0
-        ev_title = _str(cev.get('title')).strip().lower()
+        ev_title = (_str(ev.get('title')) or _str(ev.get('name'))
+                    or _str(ev.get('programTitle'))).strip().lower()
         if want:
             if ev_title == want:
                 score += 10
@@ -462,7 +753,8 @@ def _pick_best_from_list(lst, want_title=None, want_start=None):
                 score += 4
 
         if want_start_key is not None:
-            ev_start_key = _normalize_start(cev.get('start'))
+            ev_start_key = _normalize_start(
+                ev.get('start') or ev.get('start_ts') or ev.get('startTime'))
             if ev_start_key is not None:
                 diff = abs(ev_start_key - want_start_key)
                 if diff <= 60:
@@ -477,26 +769,38 @@ def _pick_best_from_list(lst, want_title=None, want_start=None):
 
         if score > best_score:
             best_score = score
-            best = cev
+            best = ev
 
-    if best is None and lst:
+    if best is None:
         for ev in lst:
             cev = _coerce_event(ev)
             if cev:
                 return cev
-    return best
+        return None
+    return _coerce_event(best)
 
 async def api_find_program(channel=None, title=None, start=None):
-    hits, meta = (None, {})
+    # Fire every applicable search variant at once instead of waiting out
+    # each miss in turn; result preference stays title+channel > title-only
+    # > channel-only.
+    tasks = []
     if title and channel:
-        hits, meta = await api_search(title=title, channel=channel, limit=10)
-        if hits: return _pick_best_from_list(hits, title, start), meta
+        tasks.append(('tc', api_search(title=title, channel=channel, limit=10)))
     if title:
-        hits, meta = await api_search(title=title, limit=10)
-        if hits: return _pick_best_from_list(hits, title, start), meta
+        tasks.append(('t', api_search(title=title, limit=10)))
     if channel:
-        hits, meta = await api_search(channel=channel, limit=10)
-        if hits: return _pick_best_from_list(hits, want_start=start), meta
+        tasks.append(('c', api_search(channel=channel, limit=10)))
+    if not tasks:
+        return None, {}
+
+    results = await asyncio.gather(*(coro for _, coro in tasks))
+    meta = {}
+    for (kind, _), (hits, m) in zip(tasks, results):
+        meta = m
+        if hits:
+            if kind == 'c':
+                return _pick_best_from_list(hits, want_start=start), m
+            return _pick_best_from_list(hits, title, start), m
     return None, meta
 
 def _parse_airtime_digits(airtime_str):
@@ -540,8 +844,8 @@ async def cache_find_catchup(title, airtime=None, download_ts=None, epg_channel_
         return None
 
     # Strip superscript/modifier markers before normalizing (e.g. ᴸᶦᵛᵉ, ᴺᵉʷ)
-    _title_clean = re.sub(r'[\u02b0-\u02ff\u1d2c-\u1dff\u2070-\u209f]+', '', (title or ''))
-    title_norm = re.sub(r'[^\w\s]', '', _title_clean.strip().lower()).strip()
+    _title_clean = _SUPERSCRIPT_RE.sub('', (title or ''))
+    title_norm = _PUNCT_RE.sub('', _title_clean.strip().lower()).strip()
     if not title_norm:
         return None
 
@@ -561,8 +865,8 @@ async def cache_find_catchup(title, airtime=None, download_ts=None, epg_channel_
             # Try title match first (substring)
             channel_filtered = [
                 ev for ev in chan_progs
-                if title_norm in re.sub(r'[\u02b0-\u02ff\u1d2c-\u1dff\u2070-\u209f]+', '',
-                    re.sub(r'[^\w\s]', '', _str(ev.get('title')).strip().lower())).strip()
+                if title_norm in _SUPERSCRIPT_RE.sub('',
+                    _PUNCT_RE.sub('', _str(ev.get('title')).strip().lower())).strip()
             ]
             if channel_filtered:
                 candidate_sets.append(channel_filtered)
@@ -608,7 +912,7 @@ async def cache_find_catchup(title, airtime=None, download_ts=None, epg_channel_
                     any_match_pri = ev_priority
             best = source_match or any_match
             if best:
-                best_start = _normalize_start(best.get('start'))
+                best_start = best.get('_start_key')
                 best_priority = best.get('priority', 999)
 
         # Phase 2: most recent start before download time (last resort)
@@ -617,7 +921,7 @@ async def cache_find_catchup(title, airtime=None, download_ts=None, epg_channel_
                 ev_priority = ev.get('priority', 999)
                 if not isinstance(ev_priority, int):
                     ev_priority = 999
-                ev_start = _normalize_start(ev.get('start'))
+                ev_start = ev.get('_start_key')
                 if ev_start is None:
                     continue
                 if ev_start > dl_epoch:
@@ -664,118 +968,141 @@ async def cache_find_program(channel=None, title=None, start_ts=None, prefer_pas
         return None
 
     start_key = _normalize_start(start_ts)
-    # Normalize title by removing punctuation for better matching
-    title_key = (title or '').strip().lower()
-    title_key_norm = re.sub(r'[^\w\s]', '', title_key).strip()  # Remove punctuation
+    # Normalize title by removing punctuation for better matching. Interned
+    # to match the interned titles stored on the index (identity fast path).
+    title_key = sys.intern((title or '').strip().lower())
+    title_key_norm = sys.intern(_PUNCT_RE.sub('', title_key).strip())
     channel_clean = clean_channel_name(channel)
+    channel_clean_lower = channel_clean.lower()
 
     candidates = []
-    seen = set()
+    # Per-search visit token: marking dicts we own is cheaper than an
+    # id()-based seen set, and stale tokens from prior searches never match.
+    tok = next(_search_counter)
 
     # For catch-ups, prioritize title search over timestamp search
     # since catch-ups can be requested hours after the original airing
     if prefer_past and title_key_norm:
-        # Search all programs and match with normalized title comparison
-        # (can't rely on index since payload may not have punctuation like "gutfeld" vs "gutfeld!")
-        for ev in data.get('programmes', []):
-            ev_title = _str(ev.get('title')).strip().lower()
-            ev_title_norm = re.sub(r'[^\w\s]', '', ev_title).strip()
+        # Exact normalized-title matches come straight from the index (O(1)),
+        # which handles punctuation mismatches like "gutfeld" vs "gutfeld!".
+        for ev in index['by_title_norm'].get(title_key_norm, []):
+            if ev.get('_v') == tok:
+                continue
+            ev['_v'] = tok
+            candidates.append(ev)
 
-            # Match if normalized titles are equal or very similar
-            if ev_title_norm == title_key_norm or title_key_norm in ev_title_norm:
-                marker = id(ev)
-                if marker in seen:
-                    continue
-                candidates.append(ev)
-                seen.add(marker)
-                # Limit to 100 candidates for performance
-                if len(candidates) >= 100:
-                    break
+        # Only fall back to the full substring scan when the index had no
+        # exact hit (e.g. payload title is a fragment of the EPG title).
+        if not candidates:
+            for ev in data.get('programmes', []):
+                ev_title_norm = ev.get('_title_norm') or ''
+                if title_key_norm in ev_title_norm:
+                    if ev.get('_v') == tok:
+                        continue
+                    ev['_v'] = tok
+                    candidates.append(ev)
+                    # Limit to 100 candidates for performance
+                    if len(candidates) >= 100:
+                        break
     elif start_key is not None:
-        # For live recordings, search by timestamp with narrow window
-        for delta in (0, -60, 60, -120, 120):
-            bucket = index['by_start'].get(start_key + delta)
-            if not bucket:
-                continue
-            for ev in bucket:
-                marker = id(ev)
-                if marker in seen:
+        # For live recordings, bisect the sorted start keys for a ±2min
+        # window — catches odd offsets the old fixed-delta probe missed.
+        starts = index['sorted_starts']
+        by_start = index['by_start']
+        lo = bisect.bisect_left(starts, start_key - 120)
+        hi = bisect.bisect_right(starts, start_key + 120)
+        for sk in starts[lo:hi]:
+            for ev in by_start[sk]:
+                if ev.get('_v') == tok:
                     continue
+                ev['_v'] = tok
                 candidates.append(ev)
-                seen.add(marker)
 
     if title_key and not prefer_past:
         # Search by exact lowercase title
         for ev in index['by_title'].get(title_key, []):
-            marker = id(ev)
-            if marker in seen:
+            if ev.get('_v') == tok:
                 continue
+            ev['_v'] = tok
             candidates.append(ev)
-            seen.add(marker)
 
         # Also search by normalized title (without punctuation)
         if title_key_norm and title_key_norm != title_key:
             for ev in index['by_title'].get(title_key_norm, []):
-                marker = id(ev)
-                if marker in seen:
+                if ev.get('_v') == tok:
                     continue
+                ev['_v'] = tok
                 candidates.append(ev)
-                seen.add(marker)
 
     if not candidates and title_key:
         for ev in data.get('programmes', []):
-            ev_title = _str(ev.get('title')).strip().lower()
-            ev_title_norm = re.sub(r'[^\w\s]', '', ev_title).strip()
-            if ev_title == title_key or ev_title_norm == title_key_norm:
+            if ev.get('_title_lower') == title_key or ev.get('_title_norm') == title_key_norm:
                 candidates.append(ev)
                 if len(candidates) >= 10:  # Limit fallback search
                     break
 
     if not candidates and channel_clean:
         for ev in data.get('programmes', []):
-            ev_chan_clean = clean_channel_name(ev.get('channel'))
-            if ev_chan_clean and ev_chan_clean.lower() == channel_clean.lower():
+            if ev.get('_chan_clean_lower') == channel_clean_lower:
                 candidates.append(ev)
                 break
 
+    # Score likely-best candidates first so the early-exit below (score >= 12)
+    # fires before the long tail is touched: an exact start+title hit scores
+    # 26 and breaks on the first iteration.
+    if len(candidates) > 1:
+        tier_exact, tier_time, tier_title, tier_rest = [], [], [], []
+        for ev in candidates:
+            time_hit = start_key is not None and ev.get('_start_key') == start_key
+            title_hit = bool(title_key_norm) and ev.get('_title_norm') == title_key_norm
+            if time_hit and title_hit:
+                tier_exact.append(ev)
+            elif time_hit:
+                tier_time.append(ev)
+            elif title_hit:
+                tier_title.append(ev)
+            else:
+                tier_rest.append(ev)
+        candidates = tier_exact + tier_time + tier_title + tier_rest
+
     best = None
     best_score = -1
-    debug_scores = []
+    debug_scores = [] if _SCORE_DEBUG else None
     for ev in candidates:
         score = 0
-        score_breakdown = {}
-        ev_title = _str(ev.get('title')).strip().lower()
-        ev_title_norm = re.sub(r'[^\w\s]', '', ev_title).strip()  # Normalize for comparison
+        score_breakdown = {} if _SCORE_DEBUG else None
+        ev_title = ev.get('_title_lower') or ''
+        ev_title_norm = ev.get('_title_norm') or ''
         if title_key and ev_title:
             # Compare normalized titles (without punctuation)
             if ev_title_norm == title_key_norm:
                 score += 6
-                score_breakdown['title_exact'] = 6
+                if _SCORE_DEBUG: score_breakdown['title_exact'] = 6
             elif title_key_norm in ev_title_norm or ev_title_norm in title_key_norm:
                 score += 4
-                score_breakdown['title_normalized_match'] = 4
+                if _SCORE_DEBUG: score_breakdown['title_normalized_match'] = 4
             elif title_key in ev_title:
                 score += 3
-                score_breakdown['title_partial'] = 3
+                if _SCORE_DEBUG: score_breakdown['title_partial'] = 3
 
         if start_key is not None:
-            ev_start_key = _normalize_start(ev.get('start'))
+            ev_start_key = ev.get('_start_key')
             if ev_start_key is not None:
                 diff = abs(ev_start_key - start_key)
                 time_offset = ev_start_key - start_key  # Positive = future, Negative = past
 
                 if diff == 0:
                     score += 20  # Exact match is very strong signal
-                    score_breakdown['time_exact'] = 20
+                    if _SCORE_DEBUG: score_breakdown['time_exact'] = 20
                 elif diff <= 60:
                     score += 10
-                    score_breakdown['time_1min'] = 10
+                    if _SCORE_DEBUG: score_breakdown['time_1min'] = 10
                 elif diff <= 180:
                     score += 5
-                    score_breakdown['time_3min'] = 5
+                    if _SCORE_DEBUG: score_breakdown['time_3min'] = 5
                 elif diff <= 600:
                     score += 2
-                    score_breakdown['time_10min'] = 2
+                    if _SCORE_DEBUG: score_breakdown['time_10min'] = 2
 
                 # For catch-ups only: prefer entries that aired in the PAST
                 # Catch-ups are always for content that already aired, not upcoming shows
@@ -788,54 +1115,47 @@ async def cache_find_program(channel=None, title=None, start_ts=None, prefer_pas
                         hours_diff = diff / 3600
                         distance_bonus = max(0, 3 - (hours_diff / 8))  # Decreases from 3 to 0 over 24 hours
                         score += distance_bonus
-                        score_breakdown['distance_bonus'] = round(distance_bonus, 1)
+                        if _SCORE_DEBUG: score_breakdown['distance_bonus'] = round(distance_bonus, 1)
 
                     if time_offset < -3600:  # More than 1 hour in the past
                         # This aired well in the past, give bonus
                         score += 5
-                        score_breakdown['past_bonus'] = 5
+                        if _SCORE_DEBUG: score_breakdown['past_bonus'] = 5
                     elif time_offset > 3600:  # More than 1 hour in the future
                         # This is upcoming/future content, heavily penalize for catch-ups
                         score -= 15
-                        score_breakdown['future_penalty'] = -15
+                        if _SCORE_DEBUG: score_breakdown['future_penalty'] = -15
 
-        if channel_clean:
-            ev_chan_clean = clean_channel_name(ev.get('channel'))
+        if channel_clean_lower:
+            ev_chan_clean = ev.get('_chan_clean_lower')
             if ev_chan_clean:
-                if ev_chan_clean.lower() == channel_clean.lower():
+                if ev_chan_clean == channel_clean_lower:
                     score += 4
-                    score_breakdown['channel_exact'] = 4
-                elif channel_clean.lower() in ev_chan_clean.lower():
+                    if _SCORE_DEBUG: score_breakdown['channel_exact'] = 4
+                elif channel_clean_lower in ev_chan_clean:
                     score += 2
-                    score_breakdown['channel_partial'] = 2
+                    if _SCORE_DEBUG: score_breakdown['channel_partial'] = 2
 
         # Prefer major US networks over specialty channels
-        ev_channel = (ev.get('channel') or '').upper()
-        if 'FOXNEWS' in ev_channel or 'FOX NEWS' in ev_channel:
-            score += 5  # Strong preference for Fox News
-            score_breakdown['network_foxnews'] = 5
-        elif 'NBC' in ev_channel or 'CBS' in ev_channel or 'ABC' in ev_channel or 'FOX' in ev_channel:
-            score += 3  # Preference for major broadcast networks
-            score_breakdown['network_major'] = 3
-        elif 'AMC' in ev_channel or 'TNT' in ev_channel or 'USA' in ev_channel or 'TBS' in ev_channel or 'BRAVO' in ev_channel or 'FX' in ev_channel or 'HULU' in ev_channel:
-            score += 4  # Preference for major cable networks
-            score_breakdown['network_cable'] = 4
-        elif 'AFN' in ev_channel or 'MILITARY' in ev_channel:
-            score -= 10  # Strongly deprioritize military/specialty channels
-            score_breakdown['network_afn_penalty'] = -10
+        network = _NETWORK_RE.search(ev.get('_chan_upper') or '')
+        if network:
+            label, bonus = _NETWORK_BONUS[network.lastgroup]
+            score += bonus
+            if _SCORE_DEBUG: score_breakdown[label] = bonus
 
         priority = ev.get('priority')
         if isinstance(priority, int):
             bonus = max(0, min(priority, 3))
             score += bonus
-            score_breakdown['priority'] = bonus
+            if _SCORE_DEBUG: score_breakdown['priority'] = bonus
 
-        debug_scores.append({
-            'channel': ev.get('channel'),
-            'title': _str(ev.get('title')),
-            'score': score,
-            'breakdown': score_breakdown
-        })
+        if _SCORE_DEBUG:
+            debug_scores.append({
+                'channel': ev.get('channel'),
+                'title': _str(ev.get('title')),
+                'score': score,
+                'breakdown': score_breakdown
+            })
 
         # Update best if score is higher, OR if score is tied but this entry aired earlier
         # (for catch-ups, earlier airings are more likely to be originals vs reruns)
@@ -844,12 +1164,12 @@ async def cache_find_program(channel=None, title=None, start_ts=None, prefer_pas
             should_update = True
         elif score == best_score and best is not None and prefer_past:
             # Tie-breaker: prefer earlier airing for catch-ups
-            ev_start_key = _normalize_start(ev.get('start'))
-            best_start_key = _normalize_start(best.get('start'))
+            ev_start_key = ev.get('_start_key')
+            best_start_key = best.get('_start_key')
             if ev_start_key is not None and best_start_key is not None:
                 if ev_start_key < best_start_key:  # Earlier = smaller timestamp
                     should_update = True
-                    score_breakdown['earlier_tiebreaker'] = 'preferred'
+                    if _SCORE_DEBUG: score_breakdown['earlier_tiebreaker'] = 'preferred'
 
         if should_update:
             best_score = score
@@ -884,6 +1204,10 @@ async def cache_find_program(channel=None, title=None, start_ts=None, prefer_pas
         meta.setdefault('channelClean', clean_channel_name(chan_key))
     return meta
 
+# HTTP statuses worth retrying: rate limiting and transient server errors.
+# Anything else 4xx means the request itself is bad and will never succeed.
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
 async def pushover_send(title, message, url=None, url_title=None, priority=0, attachment_path=None):
     if not (PO_USER and PO_TOKEN):
         logger.error("Pushover not configured", f"PO_USER={'*' * 8 if PO_USER else 'missing'} PO_TOKEN={'*' * 8 if PO_TOKEN else 'missing'}")
@@ -893,106 +1217,196 @@ async def pushover_send(title, message, url=None, url_title=None, priority=0, at
     if url: data['url'] = url
     if url_title: data['url_title'] = url_title
 
-    # Retry logic with exponential backoff
-    max_retries = int(os.environ.get('NOTIFY_RETRY_ATTEMPTS', '3'))
-    retry_delay = float(os.environ.get('NOTIFY_RETRY_DELAY', '2'))
+    # Retry logic with exponential backoff (429/5xx and transport errors only)
+    max_retries = NOTIFY_RETRY_ATTEMPTS
+    retry_delay = NOTIFY_RETRY_DELAY
 
+    def _backoff(attempt):
+        # Exponential backoff with jitter (x1.0-1.5) so several failed sends
+        # don't retry in lockstep, capped at 30s per wait.
+        return min(30.0, retry_delay * (2 ** attempt) * (1.0 + random.random() * 0.5))
+
+    client = _get_http_client()
+    # Decide attachment handling once, not per retry attempt; the file is
+    # still (re)opened per attempt so each post streams from the start.
+    attach = attachment_path if attachment_path and os.path.isfile(attachment_path) else None
+    attach_name = os.path.basename(attach) if attach else None
     for attempt in range(max_retries):
         try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                # Handle attachment - read into memory to avoid file handle leak
-                if attachment_path and os.path.isfile(attachment_path):
-                    try:
-                        # Read file into memory asynchronously
-                        async with aiofiles.open(attachment_path, 'rb') as fh:
-                            file_data = await fh.read()
-                        # File handle is now closed, safe to pass data to httpx
-                        files = {'attachment': (os.path.basename(attachment_path), file_data, 'image/gif')}
+            # Hand httpx the open file so it streams the multipart body
+            # instead of buffering file bytes in memory first
+            if attach:
+                try:
+                    with open(attach, 'rb') as fh:
+                        files = {'attachment': (attach_name, fh, 'image/gif')}
                         r = await client.post('https://api.pushover.net/1/messages.json', data=data, files=files)
-                    except (OSError, IOError) as e:
-                        # Log the error and fall back to message without attachment
-                        logger.warning(f"Failed to read attachment {attachment_path}", str(e))
-                        r = await client.post('https://api.pushover.net/1/messages.json', data=data)
-                else:
-                    # No attachment
+                except (OSError, IOError) as e:
+                    # Log the error and fall back to message without attachment
+                    logger.warning(f"Failed to read attachment {attach}", str(e))
+                    attach = None
                     r = await client.post('https://api.pushover.net/1/messages.json', data=data)
-
-                # Check if request was successful
+            else:
+                # No attachment
+                r = await client.post('https://api.pushover.net/1/messages.json', data=data)
+
+            # Check if request was successful. Parse the body once and keep
+            # the result: a 200 with an unparseable body (proxy-mangled reply)
+            # must not raise out of the rejection return below.
+            result = None
+            if r.status_code == 200:
+                try:
+                    result = r.json()
+                except Exception:
+                    result = None
+                # Body can parse to a non-dict (e.g. a bare array from a
+                # mangled proxy reply); treat anything but a dict as a reject.
+                if not isinstance(result, dict):
+                    result = None
+                if result is not None and (result.get('status') == 1 or result.get('ok')):
+                    logger.debug(f"Pushover sent successfully (attempt {attempt + 1})")
+                    return result
+
+            # If we got here, request failed. Only 429/5xx are transient and
+            # worth retrying; other statuses (bad token, invalid payload, or a
+            # 200 with an application-level rejection) won't improve on retry.
+            if r.status_code not in _RETRYABLE_STATUS:
+                logger.error(f"Pushover request rejected", f"status={r.status_code}")
                 if r.status_code == 200:
-                    try:
-                        result = r.json()
-                        if result.get('status') == 1 or result.get('ok'):
-                            logger.debug(f"Pushover sent successfully (attempt {attempt + 1})")
-                            return result
-                    except Exception:
-                        pass
-
-                # If we got here, request failed
-                if attempt < max_retries - 1:
-                    wait_time = retry_delay * (2 ** attempt)  # Exponential backoff: 2s, 4s, 8s
-                    logger.warning(f"Pushover request failed", f"status={r.status_code}, retry in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"Pushover request failed after {max_retries} attempts", f"status={r.status_code}")
-                    return r.json() if r.status_code == 200 else {'ok': r.is_success, 'status': r.status_code}
+                    return result if result is not None else {'ok': False, 'status': 200}
+                return {'ok': r.is_success, 'status': r.status_code}
+            if attempt < max_retries - 1:
+                # Honor Retry-After (seconds form) on 429/503 when present,
+                # still capped at 30s; otherwise fall back to jittered backoff.
+                retry_after = r.headers.get('Retry-After')
+                try:
+                    wait_time = min(30.0, float(retry_after)) if retry_after else _backoff(attempt)
+                except ValueError:
+                    wait_time = _backoff(attempt)
+                logger.warning(f"Pushover request failed", f"status={r.status_code}, retry in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
+                await asyncio.sleep(wait_time)
+            else:
+                logger.error(f"Pushover request failed after {max_retries} attempts", f"status={r.status_code}")
+                return {'ok': False, 'status': r.status_code}
 
         except httpx.TimeoutException:
             if attempt < max_retries - 1:
-                wait_time = retry_delay * (2 ** attempt)
-                logger.warning(f"Pushover request timeout", f"retry in {wait_time}s (attempt {attempt + 1}/{max_retries})")
+                wait_time = _backoff(attempt)
+                logger.warning(f"Pushover request timeout", f"retry in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
                 await asyncio.sleep(wait_time)
             else:
                 logger.error(f"Pushover request timeout after {max_retries} attempts")
                 return {'ok': False, 'error': 'timeout'}
         except httpx.RequestError as e:
             if attempt < max_retries - 1:
-                wait_time = retry_delay * (2 ** attempt)
-                logger.warning(f"Pushover request error", f"{type(e).__name__}, retry in {wait_time}s (attempt {attempt + 1}/{max_retries})")
+                wait_time = _backoff(attempt)
+                logger.warning(f"Pushover request error", f"{type(e).__name__}, retry in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
                 await asyncio.sleep(wait_time)
             else:
                 logger.error(f"Pushover request error after {max_retries} attempts", str(e))
                 return {'ok': False, 'error': str(e)}
 
+# action -> (push title, priority). Tuples instead of per-action dicts so
+# lookup is one dict get plus a tuple unpack, with no fallback allocation.
 _ACTION_MAP = {
     # canonical actions
-    "catchup_started":      {"title": "📥 Catch-Up Download Started", "priority": 0},
-    "catchup_completed":    {"title": "✅ Catch-Up Download Complete", "priority": 0},
-    "catchup_failed":       {"title": "❗ Catch-Up Download Failed",   "priority": 1},
-    "catchup_exit":         {"title": "⏹️ Catch-Up Download Exited",  "priority": 0},
-
-    "movie_started":        {"title": "🎬 Movie Download Started",     "priority": 0},
-    "movie_completed":      {"title": "✅ Movie Download Complete",   "priority": 0},
-    "movie_failed":         {"title": "❗ Movie Download Failed",      "priority": 1},
-    "movie_exit":           {"title": "⏹️ Movie Download Exited",      "priority": 0},
-
-    "series_started":       {"title": "🎞️ Series Download Started",   "priority": 0},
-    "series_completed":     {"title": "✅ Series Download Complete",  "priority": 0},
-    "series_failed":        {"title": "❗ Series Download Failed",     "priority": 1},
-    "series_exit":          {"title": "⏹️ Series Download Exited",     "priority": 0},
-
-    "recording_scheduled":  {"title": "🗓️ Recording Scheduled",        "priority": 0},
-    "recording_started":    {"title": "🔴 Recording Started",          "priority": 0},
-    "recording_live_started": {"title": "🔴 Recording Started",        "priority": 0},
-    "recording_completed":  {"title": "✅ Recording Complete",         "priority": 0},
-    "recording_failed":     {"title": "❗ Recording Failed",           "priority": 1},
-    "recording_cancelled":  {"title": "❌ Recording Cancelled",         "priority": 0},
-
-    "health_warn":          {"title": "❗ Health Warning",             "priority": 1},
-    "server_error":         {"title": "❗ Server Error",               "priority": 1},
-    "server_failed":        {"title": "❗ Server Failure",             "priority": 1},
-    "epg_match":            {"title": "📇 EPG Match",                  "priority": -2},
-    "ffmpeg_retry":         {"title": "🔁 Stream Reconnected/Upgraded","priority": -1},
+    "catchup_started":      ("📥 Catch-Up Download Started", 0),
+    "catchup_completed":    ("✅ Catch-Up Download Complete", 0),
+    "catchup_failed":       ("❗ Catch-Up Download Failed", 1),
+    "catchup_exit":         ("⏹️ Catch-Up Download Exited", 0),
+
+    "movie_started":        ("🎬 Movie Download Started", 0),
+    "movie_completed":      ("✅ Movie Download Complete", 0),
+    "movie_failed":         ("❗ Movie Download Failed", 1),
+    "movie_exit":           ("⏹️ Movie Download Exited", 0),
+
+    "series_started":       ("🎞️ Series Download Started", 0),
+    "series_completed":     ("✅ Series Download Complete", 0),
+    "series_failed":        ("❗ Series Download Failed", 1),
+    "series_exit":          ("⏹️ Series Download Exited", 0),
+
+    "recording_scheduled":  ("🗓️ Recording Scheduled", 0),
+    "recording_started":    ("🔴 Recording Started", 0),
+    "recording_live_started": ("🔴 Recording Started", 0),
+    "recording_completed":  ("✅ Recording Complete", 0),
+    "recording_failed":     ("❗ Recording Failed", 1),
+    "recording_cancelled":  ("❌ Recording Cancelled", 0),
+
+    "health_warn":          ("❗ Health Warning", 1),
+    "server_error":         ("❗ Server Error", 1),
+    "server_failed":        ("❗ Server Failure", 1),
+    "epg_match":            ("📇 EPG Match", -2),
+    "ffmpeg_retry":         ("🔁 Stream Reconnected/Upgraded", -1),
 
     # extra events emitted by the log monitor (low priority/noise)
-    "remux_started":        {"title": "🧩 Remux Started",              "priority": -2},
-    "remux_finished":       {"title": "✅ Remux Finished",             "priority": -2},
-    "download_started":     {"title": "📥 Download Started",           "priority": -2},
-    "cleanup_deleted_ts":   {"title": "🧹 Cleanup: TS Deleted",        "priority": -2},
+    "remux_started":        ("🧩 Remux Started", -2),
+    "remux_finished":       ("✅ Remux Finished", -2),
+    "download_started":     ("📥 Download Started", -2),
+    "cleanup_deleted_ts":   ("🧹 Cleanup: TS Deleted", -2),
 
     # synonyms for older emitters
-    "catchup_finished":     {"title": "✅ Catch-Up Download Complete", "priority": 0},
+    "catchup_finished":     ("✅ Catch-Up Download Complete", 0),
 }
 
+# Action groupings tested on every notification; frozenset membership is one
+# hash instead of a tuple scan.
+_TIMING_ACTIONS = frozenset({"recording_scheduled", "recording_started", "recording_live_started"})
+_STARTED_ACTIONS = frozenset({"recording_started", "recording_live_started"})
+_COMPLETED_ACTIONS = frozenset({"recording_completed", "catchup_completed", "movie_completed", "series_completed"})
+_SERVER_FAIL_ACTIONS = frozenset({"server_error", "server_failed"})
+
+# Burst limiter for Pushover dispatch: above this many pushes per minute,
+# routine notifications are dropped. Failures, server errors, health warnings
+# and recording starts always go through regardless of the window.
+PUSHOVER_RATE_LIMIT_PER_MIN = int(os.environ.get('PUSHOVER_RATE_LIMIT_PER_MIN', '30'))
+_HIGH_IMPACT_ACTIONS = frozenset({
+    'server_error', 'server_failed', 'health_warn',
+    'recording_started', 'recording_live_started',
+})
+_push_timestamps = deque()
+
+def _push_rate_limited(action, priority):
+    """Return True if this push should be dropped under burst conditions."""
+    if priority >= 1 or action in _HIGH_IMPACT_ACTIONS or action.endswith('_failed'):
+        return False
+    now = time.monotonic()
+    while _push_timestamps and now - _push_timestamps[0] > 60.0:
+        _push_timestamps.popleft()
+    if len(_push_timestamps) >= PUSHOVER_RATE_LIMIT_PER_MIN:
+        return True
+    _push_timestamps.append(now)
+    return False
+
+# Coalesce low-priority pushes for the same job landing within a short
+# window (e.g. a *_failed immediately followed by its *_exit) into a single
+# Pushover round-trip. High-priority pushes bypass this entirely.
+PUSHOVER_COALESCE_SEC = float(os.environ.get('PUSHOVER_COALESCE_SEC', '2'))
+_pending_pushes = {}  # job_id -> list of (title, message, priority, attachment_path)
+
+async def _flush_coalesced(job_id):
+    await asyncio.sleep(PUSHOVER_COALESCE_SEC)
+    items = _pending_pushes.pop(job_id, None)
+    if not items:
+        return
+    if len(items) == 1:
+        title, message, priority, attachment_path = items[0]
+    else:
+        # One message: first event's title, bodies stacked in arrival order,
+        # strongest priority, first attachment available.
+        title = items[0][0]
+        message = "\n\n".join(i[1] for i in items)
+        priority = max(i[2] for i in items)
+        attachment_path = next((i[3] for i in items if i[3]), None)
+        logger.debug("Coalesced pushes", f"job={job_id}, count={len(items)}")
+    await pushover_send(title=title, message=message, priority=priority,
+                        attachment_path=attachment_path)
+
+def _queue_coalesced_push(job_id, title, message, priority, attachment_path):
+    items = _pending_pushes.get(job_id)
+    if items is None:
+        _pending_pushes[job_id] = items = []
+        asyncio.create_task(_flush_coalesced(job_id))
+    items.append((title, message, priority, attachment_path))
+
 def safe_trim(s: str, limit: int) -> str:
     s = (s or "").strip()
     return (s[:limit] + "…") if len(s) > limit else s
@@ -1008,43 +1422,55 @@ async def notify(request: Request):
         # Read body once - it can't be re-read in FastAPI
         body = await request.body()
         if body:
-            body_str = body.decode('utf-8', errors='replace')
             try:
-                payload = json.loads(body_str)
-            except json.JSONDecodeError:
+                # Feed bytes straight to the parser; orjson handles the UTF-8
+                # decode in C instead of a Python-level str round-trip.
+                payload = _json_loads(body)
+            except ValueError:
                 # If JSON parsing fails, treat as raw text
-                payload = {'text': body_str}
+                payload = {'text': body.decode('utf-8', errors='replace')}
         else:
             payload = {}
     except Exception as e:
         logger.error("Failed to parse request body", str(e))
         payload = {'text': ''}
 
+    # Bind the payload once; every field read below goes through this local
+    # instead of re-evaluating (payload or {}) per access.
+    p = payload if isinstance(payload, dict) else {}
+
     # Preserve empty strings instead of converting to None via 'or' operator
     # This is important for catchups where channel may legitimately be empty
-    channel_hint = payload.get('channel') if payload and 'channel' in payload else payload.get('ch') if payload else None
+    channel_hint = p.get('channel') if 'channel' in p else p.get('ch')
     channel_clean = clean_channel_name(channel_hint)
     if not channel_clean:
         channel_clean = None
-    title   = (payload or {}).get('title')   or (payload or {}).get('program')
-    start   = (payload or {}).get('start')   or (payload or {}).get('ts')
-    start_local = (payload or {}).get('start_local') or (payload or {}).get('start_local_formatted')
-    end     = (payload or {}).get('end')     or (payload or {}).get('end_time')
-    end_local = (payload or {}).get('end_local') or (payload or {}).get('end_local_formatted')
-    airtime = (payload or {}).get('airtime')  # from timeshift URL, format: YYYY-MM-DD:HH-MM
+    title   = p.get('title')   or p.get('program')
+    start   = p.get('start')   or p.get('ts')
+    start_local = p.get('start_local') or p.get('start_local_formatted')
+    end     = p.get('end')     or p.get('end_time')
+    end_local = p.get('end_local') or p.get('end_local_formatted')
+    airtime = p.get('airtime')  # from timeshift URL, format: YYYY-MM-DD:HH-MM
 
     # Extract action early so we can use it for EPG lookup logic
-    action = (payload or {}).get('action', '').strip().lower()
+    action = p.get('action', '').strip().lower()
 
     # Validate that action is present and non-empty
     if not action:
         error_msg = "Missing or empty 'action' field in webhook payload"
-        logger.error(error_msg, f"payload={json.dumps(payload, default=str)[:300]}")
+        # Bound the preview before serializing — dumping a large payload just
+        # to slice the first 300 chars is wasted work on an error path.
+        if p:
+            preview = {k: (v if isinstance(v, (int, float, bool)) else str(v)[:60])
+                       for k, v in itertools.islice(p.items(), 8)}
+        else:
+            preview = payload
+        logger.error(error_msg, f"payload={json.dumps(preview, default=str)[:300]}")
         return JSONResponse({"ok": False, "error": error_msg}, status_code=400)
 
     # Extract job_id and file for deduplication check
-    job_id_full = (payload or {}).get("job_id_full") or (payload or {}).get("job_id") or ""
-    file_path = (payload or {}).get("file") or ""
+    job_id_full = p.get("job_id_full") or p.get("job_id") or ""
+    file_path = p.get("file") or ""
 
     # Check for duplicate notifications within TTL window
     is_duplicate, elapsed = _check_and_record_notification(action, job_id_full, file_path)
@@ -1063,13 +1489,17 @@ async def notify(request: Request):
     meta = None
     used_api = False
 
-    # Determine if this is a catch-up (will need prefer_past=True)
-    is_catchup = action.startswith('catchup_') if action else False
+    # Classify the action once; these are re-tested all over the function
+    is_catchup = action.startswith('catchup_')
+    is_movie   = action.startswith('movie_')
+    is_series  = action.startswith('series_')
+    is_failed  = action.endswith('_failed')
+    is_exit    = action.endswith('_exit')
 
     # Normalize title for catch-ups: replace " s " with "'s " (e.g., "Freddy s Revenge" -> "Freddy's Revenge")
     # This fixes titles parsed from filenames where underscores replaced apostrophes
     if is_catchup and title:
-        title = re.sub(r' s\b', "'s", title, flags=re.IGNORECASE)
+        title = _APOSTROPHE_S_RE.sub("'s", title)
 
     # Debug logging for catchups with empty channel
     if is_catchup and not channel_hint:
@@ -1077,8 +1507,8 @@ async def notify(request: Request):
 
     # EPG lookup
     # Resolve stream_id → epg_channel_id via Xtream API cache (all recording types)
-    provider_domain = (payload or {}).get('provider_domain')
-    stream_id = (payload or {}).get('stream_id')
+    provider_domain = p.get('provider_domain')
+    stream_id = p.get('stream_id')
     epg_channel_id = None
     provider_channel_name = None
     provider_source_name = None
@@ -1088,13 +1518,28 @@ async def notify(request: Request):
         # Get the provider-specific channel name (e.g. "Bravo East" from Nebula)
         raw_name = await asyncio.to_thread(_xtream_cache.lookup_name, provider_domain, stream_id)
         if raw_name:
-            provider_channel_name = re.sub(r'^[A-Z]{2,3}\s*:\s*', '', raw_name).strip() or raw_name
+            provider_channel_name = _CHAN_REGION_PREFIX_RE.sub('', raw_name).strip() or raw_name
         # Get the EPG source name (e.g. "Nebula") to prefer same-source EPG entries
         provider_source_name = await asyncio.to_thread(_xtream_cache.lookup_provider_name, provider_domain)
         if epg_channel_id:
             logger.debug("Xtream channel resolved",
                          f"provider={provider_domain}, stream_id={stream_id}, epg_channel={epg_channel_id}, provider_name={provider_channel_name}, source={provider_source_name}")
 
+    # Kick off TMDB enrichment in parallel with the EPG lookup below — they
+    # hit different hosts, so movie/series latency becomes max() not sum().
+    # Only possible when the payload carries the title; otherwise enrichment
+    # needs the EPG result and stays sequential further down.
+    tmdb_task = None
+    tmdb_kind = 'movie' if is_movie else ('series' if is_series else None)
+    if TMDB_AVAILABLE and title and tmdb_kind:
+        enricher = _TMDB_DISPATCH[tmdb_kind][0]
+        if tmdb_kind == 'movie':
+            tmdb_task = asyncio.create_task(
+                _cached_enrich('movie', enricher, _str(title), p.get("file")))
+        else:
+            tmdb_task = asyncio.create_task(
+                _cached_enrich('series', enricher, _str(title)))
+
     if is_catchup and title:
         meta = await cache_find_catchup(title, airtime=airtime, download_ts=start, epg_channel_id=epg_channel_id, provider_source=provider_source_name)
     elif epg_channel_id and title and start:
@@ -1118,7 +1563,7 @@ async def notify(request: Request):
         logger.debug(f"Catchup EPG metadata retrieved", f"channel={meta.get('channel')}, channelName={meta.get('channelName')}, title={meta.get('title')}, start={meta.get('start')}")
 
     # For catch-ups, prefer EPG start time over payload start time (payload may be download time, not air time)
-    if action.startswith('catchup_') and meta and meta.get('start'):
+    if is_catchup and meta and meta.get('start'):
         epg_start = meta.get('start')
         if epg_start and epg_start != start:
             logger.info("Overriding catch-up start time", f"{start} -> {epg_start}")
@@ -1127,34 +1572,20 @@ async def notify(request: Request):
             start_dt = _parse_timestamp(epg_start)
             if start_dt:
                 try:
-                    from datetime import timezone
-                    try:
-                        from zoneinfo import ZoneInfo
-                    except ImportError:
-                        ZoneInfo = None
-
-                    tz_name = os.environ.get('TZ')
-                    if tz_name and ZoneInfo is not None:
-                        try:
-                            local_dt = start_dt.astimezone(ZoneInfo(tz_name))
-                        except Exception:
-                            local_dt = start_dt.astimezone()
-                    else:
-                        local_dt = start_dt.astimezone()
-
+                    local_dt = start_dt.astimezone(_LOCAL_TZ) if _LOCAL_TZ else start_dt.astimezone()
                     start_local = local_dt.strftime("%Y-%m-%d %I:%M %p %Z")
                     logger.debug("Recalculated start_local", start_local)
                 except Exception as e:
                     logger.warning("Failed to recalculate start_local", str(e))
 
     # Use normalized title if available (important for catch-ups where apostrophes were replaced with spaces)
-    program_name = title or (meta or {}).get("title") or "Unknown"
-    job_id       = (payload or {}).get("job_id") or (payload or {}).get("job_id_full") or "Unknown"
+    program_name = _str(title or (meta or {}).get("title")) or "Unknown"
+    job_id       = _str(p.get("job_id") or p.get("job_id_full")) or "Unknown"
     channel_name = _pick_channel_name(
-        (payload or {}).get("channel"),
-        (payload or {}).get("ch"),
-        (payload or {}).get("channel_name"),
-        (payload or {}).get("channelClean"),
+        p.get("channel"),
+        p.get("ch"),
+        p.get("channel_name"),
+        p.get("channelClean"),
         # Provider-specific name from Xtream API (e.g. "Bravo East" from Nebula)
         # takes priority over generic EPG display names (e.g. "Bravo HD")
         provider_channel_name,
@@ -1169,12 +1600,12 @@ async def notify(request: Request):
     if is_catchup:
         logger.debug(f"Catchup channel selection", f"selected={channel_name}, payload_channel={payload.get('channel') if payload else None}, meta_channel={meta.get('channel') if meta else None}, meta_displayName={meta.get('displayName') if meta else None}")
 
-    kind = (payload or {}).get("type") or (meta or {}).get("type")
-    year = (payload or {}).get("year") or (meta or {}).get("year")
+    kind = p.get("type") or (meta or {}).get("type")
+    year = p.get("year") or (meta or {}).get("year")
 
     # IMPORTANT: Preserve description from payload (schedule data) to avoid EPG enrichment picking wrong episode
     # This is especially important for recordings where multiple episodes may have the same air time in EPG cache
-    payload_desc = (payload or {}).get("desc")
+    payload_desc = p.get("desc")
     desc_raw = payload_desc or (meta or {}).get("desc") or (meta or {}).get("description")
     desc_body = desc_raw
 
@@ -1188,66 +1619,56 @@ async def notify(request: Request):
     if is_catchup and meta:
         logger.debug("Catchup EPG metadata returned", f"keys={list(meta.keys())}, desc={desc_raw is not None}")
 
-    # TMDB enrichment for movie actions
+    # TMDB enrichment for movie/series actions — the two cases differ only in
+    # the enrich function and which date field carries the year, so one
+    # table-driven block (_TMDB_DISPATCH) covers both.
     tmdb_meta = None
-    if TMDB_AVAILABLE and action.startswith("movie_"):
+    if TMDB_AVAILABLE and tmdb_kind:
+        enricher, date_key = _TMDB_DISPATCH[tmdb_kind]
         try:
-            tmdb_meta = await asyncio.to_thread(enrich_movie_metadata, program_name, (payload or {}).get("file"))
-            if tmdb_meta:
-                # Enrich with TMDB data - prioritize TMDB descriptions for movies
-                if tmdb_meta.get('overview'):
-                    desc_raw = tmdb_meta['overview']
-                if not year and tmdb_meta.get('release_date'):
-                    year = tmdb_meta['release_date'][:4]  # Extract year from YYYY-MM-DD
-                if not kind:
-                    genres = tmdb_meta.get('genres', [])
-                    kind = ', '.join(genres[:3]) if genres else None  # First 3 genres
-                # Store additional TMDB info for later use
-                payload['tmdb_rating'] = tmdb_meta.get('vote_average')
-                payload['tmdb_votes'] = tmdb_meta.get('vote_count')
-                payload['tmdb_id'] = tmdb_meta.get('tmdb_id')
-        except Exception as e:
-            logger.warning("TMDB enrichment failed", str(e))
-
-    # TMDB enrichment for series actions
-    if TMDB_AVAILABLE and action.startswith("series_"):
-        try:
-            tmdb_meta = await asyncio.to_thread(enrich_series_metadata, program_name)
+            if tmdb_task is not None:
+                tmdb_meta = await tmdb_task
+            elif tmdb_kind == 'movie':
+                tmdb_meta = await _cached_enrich('movie', enricher, program_name, p.get("file"))
+            else:
+                tmdb_meta = await _cached_enrich('series', enricher, program_name)
             if tmdb_meta:
-                # Enrich with TMDB data - prioritize TMDB descriptions for TV series
+                # Enrich with TMDB data - prioritize TMDB descriptions
                 if tmdb_meta.get('overview'):
                     desc_raw = tmdb_meta['overview']
-                if not year and tmdb_meta.get('first_air_date'):
-                    year = tmdb_meta['first_air_date'][:4]  # Extract year from YYYY-MM-DD
+                if not year and tmdb_meta.get(date_key):
+                    year = tmdb_meta[date_key][:4]  # Extract year from YYYY-MM-DD
                 if not kind:
                     genres = tmdb_meta.get('genres', [])
                     kind = ', '.join(genres[:3]) if genres else None  # First 3 genres
                 # Store additional TMDB info for later use
-                payload['tmdb_rating'] = tmdb_meta.get('vote_average')
-                payload['tmdb_votes'] = tmdb_meta.get('vote_count')
-                payload['tmdb_id'] = tmdb_meta.get('tmdb_id')
+                p['tmdb_rating'] = tmdb_meta.get('vote_average')
+                p['tmdb_votes'] = tmdb_meta.get('vote_count')
+                p['tmdb_id'] = tmdb_meta.get('tmdb_id')
         except Exception as e:
-            logger.warning("TMDB series enrichment failed", str(e))
+            logger.warning(f"TMDB {tmdb_kind} enrichment failed", str(e))
 
     # If enrichment filled in a description after we captured desc_body,
     # make sure the body mirrors the latest value so notifications include it.
     desc_body = desc_raw
 
-    duration_min = (payload or {}).get("duration_min")
+    duration_min = p.get("duration_min")
+
+    # Parse start/end once; the duration calculation here and the recording
+    # timing lines below share the same datetimes.
+    try:
+        start_dt = _parse_timestamp(start) if start else None
+        end_dt = _parse_timestamp(end) if end else None
+    except Exception:
+        start_dt = end_dt = None
 
     # Calculate duration from start/end timestamps if not provided (common for catch-ups)
-    if not duration_min and start and end:
-        try:
-            start_dt = _parse_timestamp(start)
-            end_dt = _parse_timestamp(end)
-            if start_dt and end_dt:
-                duration_sec = (end_dt - start_dt).total_seconds()
-                if duration_sec > 0:
-                    duration_min = int(duration_sec / 60)
-        except Exception:
-            pass  # If calculation fails, leave duration_min as None
+    if not duration_min and start_dt and end_dt:
+        duration_sec = (end_dt - start_dt).total_seconds()
+        if duration_sec > 0:
+            duration_min = int(duration_sec / 60)
 
-    filepath     = (payload or {}).get("file")
+    filepath     = p.get("file")
     # Rewrite catch-up filepath to include channel name (matches what metadata_fixer will rename to)
     if filepath and channel_name and channel_name != "Unknown":
         import os as _os
@@ -1255,18 +1676,16 @@ async def notify(request: Request):
         if _fname.startswith("--"):
             _chan_fs = channel_name.replace(" ", "_")
             filepath = _os.path.join(_os.path.dirname(filepath), _chan_fs + _fname)
-    error_msg    = (payload or {}).get("error")
-    exit_code    = _as_int((payload or {}).get("exit_code"))
-    exit_reason  = (payload or {}).get("exit_reason")
-    scheduled_at = (payload or {}).get("scheduled_at")
+    error_msg    = p.get("error")
+    exit_code    = _as_int(p.get("exit_code"))
+    exit_reason  = p.get("exit_reason")
+    scheduled_at = p.get("scheduled_at")
 
     # suppress noise for *_exit with code==0
-    if action.endswith("_exit"):
+    if is_exit:
         if exit_code is None or exit_code == 0:
             return JSONResponse({"ok": True, "suppressed": True, "reason": "exit_code==0", "action": action})
 
-    DESC_LIMIT = int(os.environ.get("NOTIFY_DESC_LIMIT", "900"))
-
     # Special handling for health warnings - keep them simple
     if action == "health_warn":
         lines = []
@@ -1279,41 +1698,45 @@ async def notify(request: Request):
         body = "\n".join(lines).strip() or "Server health check failed"
     else:
         lines = []
-        lines.append(f"📺 {program_name}")
+        # Plain concatenation where the pieces are known strings; f-string
+        # formatting machinery is reserved for lines that actually format.
+        lines.append("📺 " + program_name)
 
         # Add episode info for series (VOD) or extract from EPG description for scheduled/live recordings
-        episode = (payload or {}).get("episode")
-        if action.startswith("series_") and episode:
+        episode = p.get("episode")
+        if is_series and episode:
             lines.append(f"📋 Episode: {episode}")
-        elif action in ("recording_scheduled", "recording_started", "recording_live_started") and desc_raw:
+        elif action in _TIMING_ACTIONS and desc_raw:
             # Split description into first line (episode header) and remainder
             if '\n' in desc_raw:
                 first_line, remainder = desc_raw.split('\n', 1)
             else:
                 first_line, remainder = desc_raw, ""
 
-            match = re.match(r'^(S\d+E\d+)\s*(?:[-:]\s*)?(.*)$', first_line.strip())
+            match = _EPISODE_RE.match(first_line.strip())
             if match:
                 episode_num = match.group(1).strip()
                 episode_title = match.group(2).strip()
                 if episode_title:
-                    lines.append(f"📋 Episode: {episode_num} - {episode_title}")
+                    lines.append("📋 Episode: " + episode_num + " - " + episode_title)
                 else:
-                    lines.append(f"📋 Episode: {episode_num}")
+                    lines.append("📋 Episode: " + episode_num)
                 desc_body = remainder.strip()
 
-        desc = safe_trim(desc_body, DESC_LIMIT)
+        # Skip the strip/slice helper entirely for the common no-description
+        # case instead of round-tripping None through "".
+        desc = safe_trim(desc_body, DESC_LIMIT) if desc_body else ""
 
-        lines.append(f"🆔 Job ID: {job_id}")
+        lines.append("🆔 Job ID: " + job_id)
         # Don't show channel for VOD items (movies, series) or when channel is Unknown
-        if not (action.startswith("movie_") or action.startswith("series_")) and channel_name != "Unknown":
-            lines.append(f"📡 Channel: {channel_name}")
+        if not (is_movie or is_series) and channel_name != "Unknown":
+            lines.append("📡 Channel: " + channel_name)
 
         # Show timing info for recording-related actions
-        if action in ("recording_scheduled", "recording_started", "recording_live_started"):
+        if action in _TIMING_ACTIONS:
             if action == "recording_scheduled" and scheduled_at:
                 lines.append(f"🗓️ Starts: {scheduled_at}")
-            elif action in ("recording_started", "recording_live_started"):
+            elif action in _STARTED_ACTIONS:
                 # For started recordings, show when it began
                 if start_local:
                     lines.append(f"🕘 Started: {start_local}")
@@ -1325,24 +1748,18 @@ async def notify(request: Request):
                 lines.append(f"🏁 Ends: {end_local}")
 
             # Calculate and display duration if both start and end times are available
-            if start and end:
-                try:
-                    start_dt = _parse_timestamp(start)
-                    end_dt = _parse_timestamp(end)
-                    if start_dt and end_dt:
-                        duration_sec = (end_dt - start_dt).total_seconds()
-                        if duration_sec > 0:
-                            duration_min = int(duration_sec / 60)
-                            hours = duration_min // 60
-                            minutes = duration_min % 60
-                            if hours > 0:
-                                lines.append(f"⏱️ Duration: {hours}h {minutes}m")
-                            else:
-                                lines.append(f"⏱️ Duration: {minutes}m")
-                except Exception:
-                    pass
+            if start_dt and end_dt:
+                duration_sec = (end_dt - start_dt).total_seconds()
+                if duration_sec > 0:
+                    duration_min = int(duration_sec / 60)
+                    hours = duration_min // 60
+                    minutes = duration_min % 60
+                    if hours > 0:
+                        lines.append(f"⏱️ Duration: {hours}h {minutes}m")
+                    else:
+                        lines.append(f"⏱️ Duration: {minutes}m")
         # Only show "Aired" for catchup and TV series (past content with original air dates)
-        if action.startswith("catchup_") or action.startswith("series_"):
+        if is_catchup or is_series:
             aired_label = start_local or None
             if not aired_label:
                 start_candidate = start
@@ -1360,26 +1777,26 @@ async def notify(request: Request):
             lines.append(desc)
 
         # Add TMDB rating for movies and TV series
-        if (action.startswith("movie_") or action.startswith("series_")) and tmdb_meta:
+        if (is_movie or is_series) and tmdb_meta:
             rating = tmdb_meta.get('vote_average')
             votes = tmdb_meta.get('vote_count')
             if rating:
                 rating_str = f"⭐ TMDB: {rating:.1f}/10"
                 if votes:
                     rating_str += f" ({votes:,} votes)"
-                lines.append(f"\n{rating_str}")
+                lines.append("\n" + rating_str)
 
         tail = []
-        if action in ("recording_completed", "catchup_completed", "movie_completed", "series_completed"):
+        if action in _COMPLETED_ACTIONS:
             if duration_min: tail.append(f"⏱️ {duration_min} min")
             if filepath:     tail.append(f"📁 {filepath}")
 
-        if action.endswith("_failed") or action in ("server_error", "server_failed"):
+        if is_failed or action in _SERVER_FAIL_ACTIONS:
             if error_msg:     tail.append(f"⚠️ {error_msg}")
             if exit_code is not None: tail.append(f"🔢 exit={exit_code}")
             if exit_reason:   tail.append(f"🧰 {exit_reason}")
 
-        if action.endswith("_exit") and (exit_code is not None or exit_reason):
+        if is_exit and (exit_code is not None or exit_reason):
             if exit_code is not None: tail.append(f"🔢 exit={exit_code}")
             if exit_reason:   tail.append(f"🧰 {exit_reason}")
 
@@ -1389,12 +1806,31 @@ async def notify(request: Request):
         body = "\n".join(lines).strip()
 
     default_title = f"Snappier Event: {action}"
-    action_meta = _ACTION_MAP.get(action, {"title": default_title, "priority": 0})
-    push_title = action_meta["title"]
-    priority   = action_meta["priority"]
+    push_title, priority = _ACTION_MAP.get(action) or (default_title, 0)
+
+    if _push_rate_limited(action, priority):
+        logger.warning("Pushover rate limit hit",
+                       f"action={action}, limit={PUSHOVER_RATE_LIMIT_PER_MIN}/min")
+        return JSONResponse({"ok": True, "rate_limited": True, "action": action})
 
     attachment_path = None
 
+    # Defensive fallback: ensure action is always valid in response
+    # This should never happen due to validation above, but guards against edge cases
+    response_action = action if action else "unknown"
+
+    # Low-priority events with a job id wait out the coalescing window so a
+    # burst for the same job collapses into one push.
+    if PUSHOVER_COALESCE_SEC > 0 and priority <= 0 and job_id_full:
+        _queue_coalesced_push(job_id_full, f"{push_title}", body, priority, attachment_path)
+        return JSONResponse({
+            "ok": True,
+            "pushover": {"queued": True},
+            "enriched": bool(meta),
+            "used_api": used_api,
+            "action": response_action
+        })
+
     res = await pushover_send(
         title=f"{push_title}",
         message=body,
@@ -1404,10 +1840,6 @@ async def notify(request: Request):
         attachment_path=attachment_path
     )
 
-    # Defensive fallback: ensure action is always valid in response
-    # This should never happen due to validation above, but guards against edge cases
-    response_action = action if action else "unknown"
-
     return JSONResponse({
         "ok": True,
         "pushover": res,
@@ -1418,7 +1850,7 @@ async def notify(request: Request):
 
 @app.get('/https-capabilities')
 async def https_caps():
-    return JSONResponse({'hosts': _https_support})
+    return JSONResponse({'hosts': {h: v[0] for h, v in _https_support.items()}})
 
 @app.get('/health')
 async def health():
@@ -1455,9 +1887,17 @@ async def startup_event():
     # Validate configuration on startup
     validate_pushover_config()
 
-    # Run preflight scan asynchronously
-    await _preflight_scan()
-    logger.debug("Preflight HTTPS scan completed")
+    # Kick off the preflight scan in the background: it only warms the
+    # HTTPS-capability cache, so /notify shouldn't wait out up to 2000
+    # probes x 3s before the server starts answering.
+    async def _preflight_background():
+        await _preflight_scan()
+        logger.debug("Preflight HTTPS scan completed")
+        # Persist what the scan learned so a restart starts warm.
+        await asyncio.to_thread(_save_https_cache)
+
+    _load_https_cache()
+    asyncio.create_task(_preflight_background())
 
     # Log API configuration
     if SNAPPY_API_ENABLED:
@@ -1476,6 +1916,20 @@ async def startup_event():
     # Show final startup message
     logger.info("Application startup complete.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush the probe cache and close the shared HTTP clients cleanly."""
+    global _http_client, _insecure_client
+    _save_https_cache()
+    for client in (_http_client, _insecure_client):
+        if client is not None:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+    _http_client = None
+    _insecure_client = None
+
 if __name__ == '__main__':
     import uvicorn
     host = os.environ.get('NOTIFICATION_HTTP_BIND', '0.0.0.0')
@@ -24,13 +24,27 @@ def main():
     if api_token:
         headers["x-api-token"] = api_token
     bad_count = 0
-    last_warn_ts = 0
+    # None means "never warned": monotonic() counts from boot, so seeding
+    # with 0 would suppress the first warning until uptime exceeds the
+    # cooldown window.
+    last_warn_ts = None
 
+    # One session for the probe loop: keep-alive reuses the TCP+TLS connection
+    # to the Snappy API instead of re-handshaking every interval.
+    session = requests.Session()
+    session.verify = False
+    session.headers.update(headers)
+
+    # Monotonic schedule: each cycle targets next_t rather than sleeping a
+    # full interval after the probe, so request latency doesn't accumulate
+    # as drift, and wall-clock jumps can't distort the cooldown math.
+    next_t = time.monotonic()
     while True:
-        t0 = time.time()
+        t0 = time.monotonic()
         try:
-            r = requests.get(url, timeout=args.timeout, verify=False, headers=headers)
+            r = session.get(url, timeout=args.timeout)
             ok = args.expect_min <= r.status_code <= args.expect_max
+            reason = r.reason
             if ok:
                 bad_count = 0  # reset on success; DO NOT notify 200s
             else:
@@ -39,24 +53,36 @@ def main():
             ok = False
             bad_count += 1
             r = None
+            # Record what actually went wrong instead of probing attributes
+            # on None later (which always yielded the fallback string).
+            reason = type(e).__name__
 
         if not ok:
-            if bad_count >= args.fail_threshold and (t0 - last_warn_ts) >= args.warn_cooldown:
+            if bad_count >= args.fail_threshold and (last_warn_ts is None or (t0 - last_warn_ts) >= args.warn_cooldown):
                 payload = {
                     "action": "health_warn",
                     "channel": "system",
                     "title": "Health Warning ⚠️",
-                    "desc": f"Health check failed: status={getattr(r,'status_code',None)}",
-                    "error": getattr(r,'reason', 'timeout/connection'),
+                    "desc": f"Health check failed: status={r.status_code if r is not None else None}",
+                    "error": reason,
                     "exit_code": None,
                     "exit_reason": "health_probe",
                 }
                 try:
+                    # Plain requests here: the warn path is rare and the probe
+                    # session carries the API token header, which the local
+                    # webhook doesn't need to see.
                     requests.post(args.notify_url, json=payload, timeout=5)
                 except Exception:
                     pass
                 last_warn_ts = t0
-        time.sleep(max(1, args.interval))
+        next_t += max(1, args.interval)
+        now = time.monotonic()
+        if next_t < now:
+            # A probe overran the whole interval; re-anchor instead of
+            # firing back-to-back probes to catch up.
+            next_t = now
+        time.sleep(max(0, next_t - now))
 
 if __name__ == "__main__":
     main()
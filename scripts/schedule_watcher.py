@@ -1,61 +1,155 @@
 import os
 import time
 import json
+import threading
 import unicodedata
+from collections import deque
 from pathlib import Path
+
+# orjson parses/serializes the schedule blob several times faster than
+# stdlib json; fall back transparently when it isn't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw.decode('utf-8'))
+
+def _dumps(d) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(d, option=orjson.OPT_INDENT_2)
+    return json.dumps(d, ensure_ascii=False, indent=2).encode('utf-8')
 S=os.environ.get('SCHEDULES','/root/SnappierServer/schedules.json')
 I=int(os.environ.get('SCHEDULE_WATCH_INTERVAL','30'))
 
 BAD_SPACES = {"\u202f", "\u00a0", "\u2007", "\u2060"}
+# codepoint -> space, applied in one str.translate scan instead of a
+# membership test plus replace pass per bad character.
+_BAD_TABLE = {ord(c): 0x20 for c in BAD_SPACES}
 
 def _sanitize_string(value: str) -> str:
     """Normalize unicode strings so parsing code downstream sees ASCII."""
     if not value:
         return value
-    normalized = unicodedata.normalize("NFKC", value)
-    for ch in BAD_SPACES:
-        if ch in normalized:
-            normalized = normalized.replace(ch, " ")
-    return normalized
+    # ASCII can't contain anything NFKC or the bad-space table would touch,
+    # and isascii() is an O(1) flag check on CPython — skip the real work.
+    if value.isascii():
+        return value
+    # is_normalized is a C-level quickcheck with no allocation; normalize()
+    # always builds a new string even when the input is already NFKC.
+    if unicodedata.is_normalized("NFKC", value):
+        normalized = value
+    else:
+        normalized = unicodedata.normalize("NFKC", value)
+    return normalized.translate(_BAD_TABLE)
 
 def _sanitize_container(obj):
-    """Recursively apply unicode cleanup to dict/list contents."""
+    """Apply unicode cleanup to dict/list contents via a work stack.
+
+    Iterative rather than recursive: no Python frame per nested container,
+    and no recursion-limit risk on deeply nested schedules.
+    """
     changed = False
-    if isinstance(obj, dict):
-        for key, val in list(obj.items()):
-            if isinstance(val, str):
-                cleaned = _sanitize_string(val)
-                if cleaned != val:
-                    obj[key] = cleaned
-                    changed = True
-            elif isinstance(val, (dict, list)):
-                if _sanitize_container(val):
-                    changed = True
-    elif isinstance(obj, list):
-        for idx, val in enumerate(list(obj)):
-            if isinstance(val, str):
-                cleaned = _sanitize_string(val)
-                if cleaned != val:
-                    obj[idx] = cleaned
-                    changed = True
-            elif isinstance(val, (dict, list)):
-                if _sanitize_container(val):
-                    changed = True
+    stack = deque([obj])
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            # No list() copy: the loop only reassigns values on existing
+            # keys/indexes, which is safe during iteration in CPython.
+            for key, val in cur.items():
+                if isinstance(val, str):
+                    cleaned = _sanitize_string(val)
+                    if cleaned != val:
+                        cur[key] = cleaned
+                        changed = True
+                elif isinstance(val, (dict, list)):
+                    stack.append(val)
+        elif isinstance(cur, list):
+            for idx, val in enumerate(cur):
+                if isinstance(val, str):
+                    cleaned = _sanitize_string(val)
+                    if cleaned != val:
+                        cur[idx] = cleaned
+                        changed = True
+                elif isinstance(val, (dict, list)):
+                    stack.append(val)
     return changed
 
+# mtime of the file as of the last completed pass; lets idle cycles skip
+# the parse/serialize entirely when nothing wrote the file.
+_last_mtime=None
+
 def normalize():
+    global _last_mtime
     p=Path(S)
-    if not p.exists(): return
     try:
-        raw=p.read_text(encoding='utf-8')
-        d=json.loads(raw)
+        st=p.stat()
+    except OSError:
+        return
+    if st.st_mtime==_last_mtime:
+        return
+    try:
+        raw=p.read_bytes()
+        d=_loads(raw)
     except: return
     changed=_sanitize_container(d)
-    formatted=json.dumps(d,ensure_ascii=False,indent=2)
+    formatted=_dumps(d)
     if changed or formatted!=raw:
-        p.write_text(formatted,encoding='utf-8')
+        p.write_bytes(formatted)
+    try:
+        _last_mtime=p.stat().st_mtime
+    except OSError:
+        _last_mtime=None
+def _watch_events():
+    """Block on inotify events via watchdog instead of polling.
+
+    Writes are debounced for 500ms so a burst (editor save, rsync) collapses
+    into one normalize() pass. Raises ImportError when watchdog is missing so
+    main() can fall back to the poll loop.
+    """
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+
+    target=os.path.abspath(S)
+    watch_dir=os.path.dirname(target) or '.'
+
+    class _Handler(FileSystemEventHandler):
+        def __init__(self):
+            self._timer=None
+            self._lock=threading.Lock()
+        def _debounced(self):
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer=threading.Timer(0.5, normalize)
+                self._timer.daemon=True
+                self._timer.start()
+        def on_modified(self, event):
+            if event.src_path==target:
+                self._debounced()
+        on_created=on_modified
+        def on_moved(self, event):
+            # Atomic tmp-then-rename saves (editors, rsync, os.replace) emit
+            # a move whose dest_path is the target, not a modify.
+            if getattr(event, 'dest_path', None)==target:
+                self._debounced()
+
+    observer=Observer()
+    observer.schedule(_Handler(), watch_dir, recursive=False)
+    observer.start()
+    try:
+        while True:
+            time.sleep(3600)
+    finally:
+        observer.stop(); observer.join()
+
 def main():
-    while True:
-        normalize(); time.sleep(I)
+    normalize()
+    try:
+        _watch_events()
+    except ImportError:
+        while True:
+            normalize(); time.sleep(I)
 if __name__=='__main__':
     main()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 """Shared timestamp parsing utilities for log_monitor.sh"""
+import functools
 import os
 import re
 from datetime import datetime, timezone, timedelta, time
@@ -9,6 +10,19 @@ try:
 except ImportError:
     ZoneInfo = None
 
+# Compiled once at import: log_monitor replays many lines, and literal-pattern
+# re.* calls pay a cache probe per call that these skip.
+_RE_COMPACT_TZ = re.compile(r"(\d{8})T(\d{6})([+-]\d{4})")
+_RE_COMPACT = re.compile(r"(\d{8})T(\d{6})")
+_RE_COMPACT_FLAT_TZ = re.compile(r"(\d{8})(\d{6})([+-]\d{4})")
+_RE_NONNUM = re.compile(r"[^0-9+\-]")
+_RE_NONDIGIT = re.compile(r"\D")
+_RE_OFFSET = re.compile(r"([+-]\d{2}:?\d{2})")
+
+# Log replays hit the same handful of timestamp strings over and over;
+# memoizing turns repeats into a dict hit. Safe because datetime objects
+# are immutable.
+@functools.lru_cache(maxsize=4096)
 def parse_datetime(raw):
     """Parse various datetime formats"""
     if not raw:
@@ -17,33 +31,41 @@ def parse_datetime(raw):
     if not raw:
         return None
 
-    normalized = raw.replace('Z', '+00:00')
-    candidates = [normalized]
-
-    m = re.fullmatch(r"(\d{8})T(\d{6})([+-]\d{4})", raw)
-    if m:
-        date_part, time_part, offset = m.groups()
-        candidates.append(
-            f"{date_part[:4]}-{date_part[4:6]}-{date_part[6:]}T"
-            f"{time_part[:2]}:{time_part[2:4]}:{time_part[4:]}"
-            f"{offset[:3]}:{offset[3:]}"
-        )
-
-    m = re.fullmatch(r"(\d{8})T(\d{6})", raw)
-    if m:
-        date_part, time_part = m.groups()
-        candidates.append(
-            f"{date_part[:4]}-{date_part[4:6]}-{date_part[6:]}T"
-            f"{time_part[:2]}:{time_part[2:4]}:{time_part[4:]}"
-        )
-
-    for candidate in candidates:
-        try:
-            return datetime.fromisoformat(candidate)
-        except Exception:
-            continue
-
-    m = re.fullmatch(r"(\d{8})(\d{6})([+-]\d{4})", re.sub(r"[^0-9+\-]", "", raw))
+    # ISO-8601 is the overwhelmingly common shape, so try it first: one C
+    # call into fromisoformat, no candidate list, no regex.
+    try:
+        return datetime.fromisoformat(raw.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+
+    # O(1) shape checks gate the compact-pattern regexes: a compact stamp is
+    # exactly 15 chars (20 with offset) with 'T' at index 8.
+    n = len(raw)
+    if n == 20 and raw[8] == 'T' and raw[15] in '+-':
+        m = _RE_COMPACT_TZ.fullmatch(raw)
+        if m:
+            date_part, time_part, offset = m.groups()
+            try:
+                return datetime.fromisoformat(
+                    f"{date_part[:4]}-{date_part[4:6]}-{date_part[6:]}T"
+                    f"{time_part[:2]}:{time_part[2:4]}:{time_part[4:]}"
+                    f"{offset[:3]}:{offset[3:]}"
+                )
+            except ValueError:
+                pass
+    elif n == 15 and raw[8] == 'T':
+        m = _RE_COMPACT.fullmatch(raw)
+        if m:
+            date_part, time_part = m.groups()
+            try:
+                return datetime.fromisoformat(
+                    f"{date_part[:4]}-{date_part[4:6]}-{date_part[6:]}T"
+                    f"{time_part[:2]}:{time_part[2:4]}:{time_part[4:]}"
+                )
+            except ValueError:
+                pass
+
+    m = _RE_COMPACT_FLAT_TZ.fullmatch(_RE_NONNUM.sub("", raw))
     if m:
         date_part, time_part, offset = m.groups()
         try:
@@ -56,11 +78,11 @@ def parse_datetime(raw):
         except Exception:
             pass
 
-    digits = re.sub(r"\D", "", raw)
+    digits = _RE_NONDIGIT.sub("", raw)
     if len(digits) == 14:
         try:
             dt = datetime.strptime(digits, "%Y%m%d%H%M%S")
-            off_match = re.search(r"([+-]\d{2}:?\d{2})", raw)
+            off_match = _RE_OFFSET.search(raw)
             offset = off_match.group(1) if off_match else "+0000"
             offset = offset.replace(":", "")
             sign = 1 if offset.startswith('+') else -1
@@ -73,6 +95,7 @@ def parse_datetime(raw):
 
     return None
 
+@functools.lru_cache(maxsize=4096)
 def parse_time_of_day(raw):
     """Parse time of day (HH:MM, noon, midnight, etc.)"""
     if not raw:
@@ -105,6 +128,14 @@ def parse_time_of_day(raw):
             continue
     return None
 
+@functools.lru_cache(maxsize=None)
+def _zoneinfo(tz_name):
+    """ZoneInfo(tz_name), built once per zone instead of re-reading tzdata."""
+    try:
+        return ZoneInfo(tz_name)
+    except Exception:
+        return None
+
 def ensure_timezone(dt, fallback_dt=None):
     """Ensure datetime has timezone info"""
     if dt is None:
@@ -114,10 +145,9 @@ def ensure_timezone(dt, fallback_dt=None):
             return dt.replace(tzinfo=fallback_dt.tzinfo)
         tz_name = os.environ.get("TZ")
         if tz_name and ZoneInfo is not None:
-            try:
-                return dt.replace(tzinfo=ZoneInfo(tz_name))
-            except Exception:
-                return dt.replace(tzinfo=timezone.utc)
+            tz = _zoneinfo(tz_name)
+            if tz is not None:
+                return dt.replace(tzinfo=tz)
         return dt.replace(tzinfo=timezone.utc)
     return dt
 
@@ -12,6 +12,7 @@ Cache refreshes automatically when older than REFRESH_INTERVAL_SEC.
 import json
 import os
 import sys
+import threading
 import time
 import re
 from datetime import datetime, timezone
@@ -37,6 +38,7 @@ _cache = {}          # (domain, stream_id_str) → epg_channel_id
 _channel_names = {}  # (domain, stream_id_str) → channel display name
 _last_refresh = 0
 _providers = []      # list of {domain, scheme, username, password, name}
+_refresh_lock = threading.Lock()  # serialize provider fetches across threads
 
 
 def _parse_providers():
@@ -70,10 +72,23 @@ def _parse_providers():
     return _providers
 
 
+# Shared session (created on first fetch) so the per-provider API calls in a
+# refresh reuse pooled connections instead of handshaking per request.
+_session = None
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.verify = False
+    return _session
+
+
 def _fetch_json(url):
     """Fetch JSON from URL using requests or httpx."""
     if _HAS_REQUESTS:
-        r = requests.get(url, timeout=REQUEST_TIMEOUT, verify=False)
+        r = _get_session().get(url, timeout=REQUEST_TIMEOUT)
         r.raise_for_status()
         return r.json()
     elif _HAS_HTTPX:
@@ -86,12 +101,31 @@ def _fetch_json(url):
 
 
 def refresh(force=False):
-    """Refresh the cache if stale or forced."""
+    """Refresh the cache if stale or forced.
+
+    Callers hit this from multiple threads (the webhook dispatches lookups via
+    asyncio.to_thread); the lock plus the re-check below make sure only one
+    thread fetches the provider lists while the others wait and reuse it.
+    """
     global _cache, _channel_names, _last_refresh
 
-    if not force and _cache and (time.time() - _last_refresh) < REFRESH_INTERVAL_SEC:
+    def _is_fresh():
+        return _cache and (time.time() - _last_refresh) < REFRESH_INTERVAL_SEC
+
+    if not force and _is_fresh():
         return  # cache is fresh
 
+    with _refresh_lock:
+        # Double-check: another thread may have refreshed while we waited.
+        if not force and _is_fresh():
+            return
+        _refresh_locked(force)
+
+
+def _refresh_locked(force=False):
+    """Fetch provider stream lists; must be called with _refresh_lock held."""
+    global _cache, _channel_names, _last_refresh
+
     providers = _parse_providers()
     if not providers:
         return